@@ -0,0 +1,101 @@
+"""Check each glueops module's import time against a budget.
+
+Every module is imported in a fresh interpreter under `python -X importtime`
+(best of --repeat runs, after one run to write bytecode caches). Two things
+are checked:
+
+    budget   cumulative import time of the module, in milliseconds
+    heavy    httpx, requests, boto3, kubernetes, cryptography or pycdlib
+             imported eagerly; these must load on first use (glueops.lazy_import)
+
+Budgets are deliberately loose; the heavy-module check is the one that does
+not depend on the machine. Modules whose dependencies are not installed are
+reported as skipped. Exits 1 if any module is over budget or imports a heavy
+dependency, so it can run in CI.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --repeat 10 --scale 2   # slow machine: double every budget
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+HEAVY = ("httpx", "requests", "boto3", "botocore", "kubernetes", "cryptography", "pycdlib")
+
+# module -> cumulative import budget in ms; asyncio alone accounts for most of proxmox's and vault_client's
+BUDGETS_MS = {
+    "glueops.aws": 30,
+    "glueops.certificates": 30,
+    "glueops.checksum_tools": 20,
+    "glueops.getoutline": 80,
+    "glueops.http_metrics": 20,
+    "glueops.json_codec": 40,
+    "glueops.nocloud_iso": 20,
+    "glueops.proxmox": 150,
+    "glueops.setup_kubernetes": 30,
+    "glueops.setup_logging": 70,
+    "glueops.vault_client": 60,
+    "glueops.waggle": 80,
+}
+
+
+def measure(module: str, env: dict):
+    """Return (cumulative ms, set of modules imported), or raise RuntimeError
+    with the interpreter's last error line."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    imported, total_us = set(), None
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            total_us = int(cumulative)
+    return total_us / 1000, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget")
+    parser.add_argument("modules", nargs="*", default=sorted(BUDGETS_MS))
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    failed = False
+    print(f"{'module':<26} {'ms':>8} {'budget':>8}  result")
+    for module in args.modules:
+        budget = BUDGETS_MS.get(module, 50) * args.scale
+        try:
+            measure(module, env)  # writes .pyc files so compiling isn't measured
+            runs = [measure(module, env) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{module:<26} {'-':>8} {budget:>8.0f}  skipped: {e}")
+            continue
+        ms = min(total for total, _ in runs)
+        heavy = sorted(name for name in set.union(*(imported for _, imported in runs)) if name in HEAVY)
+        problems = []
+        if ms > budget:
+            problems.append("over budget")
+        if heavy:
+            problems.append(f"imports {', '.join(heavy)} eagerly")
+        failed = failed or bool(problems)
+        print(f"{module:<26} {ms:>8.1f} {budget:>8.0f}  {'; '.join(problems) or 'ok'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
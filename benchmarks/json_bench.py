@@ -0,0 +1,79 @@
+"""Compare glueops.json_codec backends on the workloads they serve.
+
+    decode /cluster/resources   one response body for --vms VMs (several MB at 10k+)
+    JsonFormatter.format        --records log records through setup_logging's formatter
+
+Each installed backend (orjson, msgspec, stdlib json) is timed in turn; the
+stdlib row is the baseline the others are compared against.
+
+Usage:
+    python benchmarks/json_bench.py
+    python benchmarks/json_bench.py --vms 50000 --records 200000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from glueops import json_codec  # noqa: E402
+from glueops.setup_logging import JsonFormatter  # noqa: E402
+
+
+def cluster_resources_body(vms: int) -> bytes:
+    resources = [{
+        "id": f"qemu/{100 + i}", "type": "qemu", "vmid": 100 + i, "node": f"pve{i % 16 + 1}",
+        "name": f"tenant{i % 50}-vm{i}", "status": "running" if i % 7 else "stopped",
+        "tags": f"glueops;tenant{i % 50};pool-{i % 9}", "template": 0, "cpu": 0.0123, "maxcpu": 4,
+        "mem": 2147483648, "maxmem": 4294967296, "disk": 0, "maxdisk": 42949672960, "uptime": 86400 + i,
+        "netin": 123456789, "netout": 98765432, "diskread": 555555555, "diskwrite": 444444444,
+    } for i in range(vms)]
+    return json_codec._BACKENDS["json"][1]({"data": resources}).encode()
+
+
+def best_of(repeat: int, fn) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--vms", type=int, default=20000)
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    body = cluster_resources_body(args.vms)
+    formatter = JsonFormatter()
+    records = [logging.LogRecord("glueops.proxmox", logging.INFO, __file__, 1,
+                                 "VM %s: guest agent not ready: %s", (100 + i, "QEMU guest agent is not running"), None)
+               for i in range(1000)]
+
+    def format_records():
+        for i in range(args.records):
+            formatter.format(records[i % len(records)])
+
+    default = json_codec.BACKEND
+    rows = []
+    for backend in json_codec.available_backends():
+        json_codec.use_backend(backend)
+        rows.append((backend, best_of(args.repeat, lambda: json_codec.loads(body)),
+                     best_of(args.repeat, format_records)))
+    json_codec.use_backend(default)
+
+    baseline = {name: (decode, fmt) for name, decode, fmt in rows}["json"]
+    print(f"/cluster/resources body: {len(body) / 1e6:.1f} MB ({args.vms} VMs); {args.records} log records")
+    print(f"{'backend':<10} {'decode s':>10} {'vs json':>8} {'format s':>10} {'vs json':>8}")
+    for name, decode, fmt in rows:
+        print(f"{name:<10} {decode:>10.4f} {baseline[0] / decode:>7.1f}x {fmt:>10.4f} {baseline[1] / fmt:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
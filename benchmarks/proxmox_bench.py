@@ -0,0 +1,164 @@
+"""Benchmark ProxmoxClient against the in-process simulator (tests/proxmox_sim.py).
+
+Measures wall time and API request counts for the calls that dominate
+provisioning runs, at several cluster sizes:
+
+    list_vms_by_tags       20 tag queries, fetching each time vs one ClusterSnapshot
+    delete_isos_matching   sweep N orphaned ISOs while N VMs keep theirs attached
+    ensure_image_cached    N concurrent callers for one image on cold nodes
+    create_start_delete    provision_many N VMs (booted, cloud-init done), then delete them
+
+Request counts barely move between runs of the same client version (task
+polling adds a little jitter), so they are the number to compare across
+commits; wall times depend on --latency, the simulated task durations and boot
+delays, and the machine. create_start_delete runs with provision_many's default
+stage and per-node limits, so its wall time reflects those limits too.
+
+Usage:
+    python benchmarks/proxmox_bench.py                      # sizes 10 100 1000
+    python benchmarks/proxmox_bench.py --sizes 10 100 --latency 0.005
+    python benchmarks/proxmox_bench.py --json > before.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from glueops.proxmox import ClusterSnapshot, ProxmoxClient  # noqa: E402
+from proxmox_sim import FakeProxmox  # noqa: E402
+
+NODES = ["pve1", "pve2", "pve3"]
+TAG_QUERIES = [["bench"], ["bench", "tenant-a"], ["bench", "tenant-b"], ["missing"]] * 5
+
+
+def _client(sim: FakeProxmox, **kwargs) -> ProxmoxClient:
+    return ProxmoxClient("sim", "bench@pve!bench", "secret", storage=sim.storage,
+                         transport=sim.transport(), **kwargs)
+
+
+async def bench_list_vms_by_tags(size: int, latency: float) -> list:
+    sim = FakeProxmox(nodes=NODES, latency=latency)
+    sim.add_vms(size // 2, tags=["bench", "tenant-a"], iso_per_vm=False)
+    sim.add_vms(size - size // 2, tags=["bench", "tenant-b"], first_vmid=100 + size // 2, iso_per_vm=False)
+    client = _client(sim)
+    results = []
+    try:
+        started = time.perf_counter()
+        for tags in TAG_QUERIES:
+            await client.list_vms_by_tags(tags)
+        results.append(("list_vms_by_tags", time.perf_counter() - started, sim.request_count()))
+        sim.reset_counts()
+        snapshot = ClusterSnapshot(client, ttl=60)
+        started = time.perf_counter()
+        for tags in TAG_QUERIES:
+            await client.list_vms_by_tags(tags, snapshot=snapshot)
+        results.append(("list_vms_by_tags (snapshot)", time.perf_counter() - started, sim.request_count()))
+    finally:
+        await client.aclose()
+    return results
+
+
+async def bench_delete_isos_matching(size: int, latency: float) -> list:
+    sim = FakeProxmox(nodes=NODES, latency=latency)
+    sim.add_vms(size, snapshots_per_vm=1)  # each keeps vm<id>-cloudinit.iso attached
+    for i in range(size):
+        sim.add_volume(NODES[i % len(NODES)], f"{sim.storage}:iso/orphan{i}-cloudinit.iso", size=55296)
+    client = _client(sim)
+    try:
+        started = time.perf_counter()
+        deleted = await client.delete_isos_matching(r".*-cloudinit\.iso")
+        elapsed = time.perf_counter() - started
+    finally:
+        await client.aclose()
+    assert deleted == size, f"deleted {deleted} of {size} orphans"
+    return [("delete_isos_matching", elapsed, sim.request_count())]
+
+
+async def bench_ensure_image_cached(size: int, latency: float) -> list:
+    sim = FakeProxmox(nodes=NODES, latency=latency)
+    client = _client(sim, download_server_url="https://images.example.com")
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*[client.ensure_image_cached(NODES[i % len(NODES)], "debian-13-generic-amd64")
+                               for i in range(size)])
+        elapsed = time.perf_counter() - started
+    finally:
+        await client.aclose()
+    return [("ensure_image_cached", elapsed, sim.request_count())]
+
+
+async def bench_create_start_delete(size: int, latency: float) -> list:
+    sim = FakeProxmox(nodes=NODES, latency=latency)
+    for node in NODES:
+        sim.add_volume(node, f"{sim.storage}:import/debian-13-generic-amd64.qcow2")
+    client = _client(sim)
+    specs = [dict(node=NODES[i % len(NODES)], vm_name=f"bench{i}", vcpus=2, memory_mb=2048,
+                  image="debian-13-generic-amd64", bridge="vmbr0", tags=["bench"], disk_gb=20,
+                  user_data=b"#cloud-config\n", meta_data=f"instance-id: bench{i}\n".encode())
+             for i in range(size)]
+    try:
+        started = time.perf_counter()
+        created = []
+        async for result in client.provision_many(specs, eject_iso=True):
+            if result["error"] is not None:
+                raise result["error"]
+            created.append(result)
+        semaphore = asyncio.Semaphore(32)
+
+        async def delete(result):
+            async with semaphore:
+                await client.delete_vm(result["node"], result["vmid"])
+
+        await asyncio.gather(*[delete(result) for result in created])
+        elapsed = time.perf_counter() - started
+    finally:
+        await client.aclose()
+    assert not sim.vms, f"{len(sim.vms)} VMs left behind"
+    return [("create_start_delete", elapsed, sim.request_count())]
+
+
+BENCHMARKS = {
+    "list_vms_by_tags": bench_list_vms_by_tags,
+    "delete_isos_matching": bench_delete_isos_matching,
+    "ensure_image_cached": bench_ensure_image_cached,
+    "create_start_delete": bench_create_start_delete,
+}
+
+
+async def run(sizes, latency: float, selected) -> list:
+    rows = []
+    for name in selected:
+        for size in sizes:
+            for label, seconds, requests in await BENCHMARKS[name](size, latency):
+                rows.append({"benchmark": label, "vms": size, "seconds": round(seconds, 4), "requests": requests})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--latency", type=float, default=0.001, help="simulated seconds per request")
+    parser.add_argument("--only", choices=sorted(BENCHMARKS), nargs="+", default=list(BENCHMARKS))
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # the client logs every VM and skipped ISO; keep the report readable
+
+    rows = asyncio.run(run(args.sizes, args.latency, args.only))
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'benchmark':<30} {'vms':>6} {'seconds':>9} {'requests':>9}")
+    for row in rows:
+        print(f"{row['benchmark']:<30} {row['vms']:>6} {row['seconds']:>9.3f} {row['requests']:>9}")
+
+
+if __name__ == "__main__":
+    main()
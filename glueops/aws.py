@@ -1,10 +1,14 @@
-from typing import List
+from typing import TYPE_CHECKING, List
 
-import boto3
-from botocore.client import BaseClient
+from glueops.lazy_import import lazy_import
 
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
 
-def create_aws_client(service: str, region: str = 'us-east-1') -> BaseClient:
+boto3 = lazy_import("boto3")
+
+
+def create_aws_client(service: str, region: str = 'us-east-1') -> "BaseClient":
     return boto3.client(service, region_name=region)
 
 
@@ -1,10 +1,11 @@
-from cryptography import x509
-from cryptography.hazmat.backends import default_backend
-from cryptography.exceptions import UnsupportedAlgorithm, InvalidSignature
+from glueops.lazy_import import lazy_import
+
+x509 = lazy_import("cryptography.x509")
+backends = lazy_import("cryptography.hazmat.backends")
 
 
 def extract_serial_number_from_cert_string(cert_string: str) -> str:
-    certificate = x509.load_pem_x509_certificate(cert_string.encode(), default_backend())
+    certificate = x509.load_pem_x509_certificate(cert_string.encode(), backends.default_backend())
     decimal_serial = certificate.serial_number
 
     # Convert to hexadecimal
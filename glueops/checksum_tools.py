@@ -1,5 +1,6 @@
 import zlib
 import hashlib
+import json
 
 def string_to_crc32(input_string: str) -> str:
     """Compute CRC32 checksum for a given string and return it in hexadecimal format."""
@@ -18,3 +19,16 @@ def compute_sha224(input_string: str) -> str:
     sha224_hash = hashlib.sha224()
     sha224_hash.update(input_string.encode('utf-8'))
     return sha224_hash.hexdigest()
+
+def compute_sha224_bytes(input_bytes: bytes) -> str:
+    """Compute SHA224 checksum for given bytes and return it in hexadecimal format."""
+
+    sha224_hash = hashlib.sha224()
+    sha224_hash.update(input_bytes)
+    return sha224_hash.hexdigest()
+
+def compute_sha224_json(obj) -> str:
+    """Compute SHA224 checksum of obj's canonical JSON (sorted keys, no whitespace),
+    so equal data gives the same checksum whatever its key order."""
+
+    return compute_sha224(json.dumps(obj, sort_keys=True, separators=(',', ':'), ensure_ascii=False))
@@ -1,8 +1,11 @@
-import requests
 import os
-from glueops import setup_logging
+from glueops import json_codec, setup_logging
+from glueops.lazy_import import lazy_import
 import traceback
 
+httpx = lazy_import("httpx")
+requests = lazy_import("requests")
+
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 logger = setup_logging.configure(level=LOG_LEVEL)
 
@@ -11,21 +14,43 @@ class GetOutlineClient:
     A client to interact with the Outline API for managing documents.
     """
 
-    def __init__(self, api_url, document_id, api_token):
+    def __init__(self, api_url, document_id, api_token, pool_maxsize=10, timeout=30.0):
         """
         Initializes the GetOutlineClient with the necessary API credentials.
 
+        Calls share one requests.Session, so republishing a document tree
+        reuses kept-alive connections instead of a TLS handshake per call.
+
         :param api_url: The base URL for the Outline API.
         :param document_id: The ID of the document to manage.
         :param api_token: The API token for authentication.
+        :param pool_maxsize: Connections kept open to Outline.
+        :param timeout: Seconds to wait for Outline to connect or respond, or a
+            (connect, read) tuple.
         """
         self.api_url = api_url.rstrip('/')  # Ensure no trailing slash
         self.document_id = document_id
         self.api_token = api_token
+        self.timeout = timeout
         self.headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_token}"
         }
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self):
+        """Close the pooled connections."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     def update_document(self, markdown_text):
         """
@@ -41,7 +66,7 @@ class GetOutlineClient:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=self.headers)
+            response = self.session.post(url, json=payload, timeout=self.timeout)
             response.raise_for_status()
             logger.info(f"Updated document with ID: {self.document_id}")
         except requests.exceptions.RequestException as e:
@@ -61,7 +86,7 @@ class GetOutlineClient:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=self.headers)
+            response = self.session.post(url, json=payload, timeout=self.timeout)
             response.raise_for_status()
             parent_id = response.json().get("data", {}).get("id")
             logger.debug(f"Parent document UUID: {parent_id}")
@@ -89,7 +114,7 @@ class GetOutlineClient:
 
         try:
             while True:
-                response = requests.post(url, json=payload, headers=self.headers)
+                response = self.session.post(url, json=payload, timeout=self.timeout)
                 response.raise_for_status()
                 data = response.json()
                 child_docs = data.get("data", [])
@@ -126,7 +151,7 @@ class GetOutlineClient:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=self.headers)
+            response = self.session.post(url, json=payload, timeout=self.timeout)
             response.raise_for_status()
             logger.debug(f"Successfully deleted document with ID: {document_id}")
             return True
@@ -154,7 +179,7 @@ class GetOutlineClient:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=self.headers)
+            response = self.session.post(url, json=payload, timeout=self.timeout)
             response.raise_for_status()
             logger.info(f"Successfully created document with title: {title}")
             return True
@@ -163,3 +188,161 @@ class GetOutlineClient:
             logger.error(traceback.format_exc())
             raise
 
+
+class AsyncGetOutlineClient:
+    """
+    asyncio variant of GetOutlineClient with the same operations, over one
+    shared httpx.AsyncClient, so e.g. deleting a document's children can run
+    concurrently. Call aclose() (or use `async with`) when done.
+    """
+
+    def __init__(self, api_url, document_id, api_token, limits=None, timeout=30.0, transport=None):
+        """
+        :param api_url: The base URL for the Outline API.
+        :param document_id: The ID of the document to manage.
+        :param api_token: The API token for authentication.
+        :param limits: httpx.Limits for the connection pool (default: httpx's defaults).
+        :param timeout: Seconds to wait for Outline to connect or respond (or an httpx.Timeout).
+        :param transport: httpx transport used instead of the network (e.g.
+            httpx.MockTransport in tests); limits then does not apply.
+        """
+        self.api_url = api_url.rstrip('/')
+        self.document_id = document_id
+        self.api_token = api_token
+        self.timeout = timeout
+        self.limits = limits
+        self.headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_token}"
+        }
+        self._transport = transport
+        self._http = None
+
+    def _client(self) -> "httpx.AsyncClient":
+        if self._http is None or self._http.is_closed:
+            options = {}
+            if self._transport is not None:
+                options["transport"] = self._transport
+            elif self.limits is not None:
+                options["limits"] = self.limits
+            self._http = httpx.AsyncClient(base_url=self.api_url, headers=self.headers, timeout=self.timeout, **options)
+        return self._http
+
+    async def aclose(self):
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def _post(self, method, payload):
+        response = await self._client().post(f"/api/{method}", json=payload)
+        response.raise_for_status()
+        return json_codec.loads(response.content) if response.content else {}
+
+    async def update_document(self, markdown_text):
+        """
+        Updates the content of the specified document with new markdown text.
+
+        :param markdown_text: The new markdown text to update the document with.
+        """
+        logger.debug("Updating document on Outline.")
+        try:
+            await self._post("documents.update", {"id": self.document_id, "text": markdown_text})
+            logger.info(f"Updated document with ID: {self.document_id}")
+        except httpx.HTTPError as e:
+            logger.error(f"Error updating document: {e}")
+            logger.error(traceback.format_exc())
+            raise
+
+    async def get_document_uuid(self):
+        """
+        Retrieves the UUID of the parent document.
+
+        :return: The UUID of the parent document.
+        """
+        try:
+            data = await self._post("documents.info", {"id": self.document_id})
+            parent_id = data.get("data", {}).get("id")
+            logger.debug(f"Parent document UUID: {parent_id}")
+            return parent_id
+        except httpx.HTTPError as e:
+            logger.error(f"Error getting parent document UUID: {e}")
+            logger.error(traceback.format_exc())
+            raise
+
+    async def get_children_documents_to_delete(self, parent_document_id):
+        """
+        Retrieves a list of child document IDs under the specified parent document.
+
+        :param parent_document_id: The UUID of the parent document.
+        :return: A list of child document IDs.
+        """
+        payload = {
+            "parentDocumentId": parent_document_id,
+            "limit": 100,
+            "offset": 0
+        }
+        all_ids = []
+
+        try:
+            while True:
+                data = await self._post("documents.list", payload)
+                new_ids = [doc.get("id") for doc in data.get("data", []) if "id" in doc]
+                all_ids.extend(new_ids)
+
+                next_path = data.get("pagination", {}).get("nextPath")
+                if len(new_ids) == 0 or not next_path:
+                    break
+                payload["offset"] += payload["limit"]
+
+            logger.debug(f"Child document IDs to delete: {all_ids}")
+            return all_ids
+        except httpx.HTTPError as e:
+            logger.error(f"Error getting children documents: {e}")
+            logger.error(traceback.format_exc())
+            raise
+
+    async def delete_document(self, document_id):
+        """
+        Deletes a document with the specified document ID.
+
+        :param document_id: The ID of the document to delete.
+        :return: True if deletion was successful.
+        """
+        try:
+            await self._post("documents.delete", {"id": document_id})
+            logger.debug(f"Successfully deleted document with ID: {document_id}")
+            return True
+        except httpx.HTTPError as e:
+            logger.error(f"Error deleting document {document_id}: {e}")
+            logger.error(traceback.format_exc())
+            raise
+
+    async def create_document(self, parent_document_id, title, text):
+        """
+        Creates a new document under the specified parent document.
+
+        :param parent_document_id: The UUID of the parent document.
+        :param title: The title of the new document.
+        :param text: The markdown text content of the new document.
+        :return: True if creation was successful.
+        """
+        payload = {
+            "parentDocumentId": parent_document_id,
+            "title": title,
+            "text": text,
+            "publish": True
+        }
+
+        try:
+            await self._post("documents.create", payload)
+            logger.info(f"Successfully created document with title: {title}")
+            return True
+        except httpx.HTTPError as e:
+            logger.error(f"Error creating document '{title}': {e}")
+            logger.error(traceback.format_exc())
+            raise
@@ -0,0 +1,208 @@
+"""Optional per-endpoint request metrics for the httpx-based API clients.
+
+An HttpMetrics instance hooks into httpx's request/response event hooks and
+records, per (method, path template): a latency histogram, response status
+counts, and bytes sent/received. Paths are normalized to templates such as
+/nodes/{node}/qemu/{vmid}/status/current, so metrics stay bounded no matter
+how many nodes, VMs, or tasks a run touches.
+
+Clients only install the hooks when given a metrics object; without one no
+hooks run at all.
+
+Usage:
+    from glueops.http_metrics import HttpMetrics
+    from glueops.proxmox import ProxmoxClient
+    from glueops.waggle import WaggleClient
+
+    metrics = HttpMetrics()
+    proxmox = ProxmoxClient(..., metrics=metrics)
+    waggle = WaggleClient(..., metrics=metrics)
+    ...
+    metrics.snapshot()           # {"proxmox GET /nodes/{node}/qemu/{vmid}/config": {...}, ...}
+    metrics.render_prometheus()  # text exposition format
+"""
+
+import threading
+import time
+
+# Prometheus' default latency buckets, extended for slow Proxmox calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_API_PREFIXES = ("/api2/json", "/api/v1")
+
+# Collection segment -> placeholder for the identifier that follows it
+_ID_SEGMENTS = {
+    "nodes": "{node}",
+    "qemu": "{vmid}",
+    "lxc": "{vmid}",
+    "tasks": "{upid}",
+    "storage": "{storage}",
+    "content": "{volid}",
+    "datacenters": "{id}",
+    "hypervisors": "{id}",
+    "slots": "{id}",
+    "pools": "{id}",
+    "placements": "{id}",
+}
+
+_STARTED = "glueops_metrics_started"
+
+
+def normalize_path(path: str) -> str:
+    """Map a request path to its template: the API prefix is dropped and the
+    segment after each known collection is replaced by a placeholder, e.g.
+    /api2/json/nodes/pve1/qemu/101/config -> /nodes/{node}/qemu/{vmid}/config.
+
+    Pass the raw (still percent-encoded) path so identifiers containing "/"
+    (volids, UPIDs) stay one segment.
+    """
+    path = path.split("?", 1)[0]
+    for prefix in _API_PREFIXES:
+        if path.startswith(prefix):
+            path = path[len(prefix):]
+            break
+    segments = path.strip("/").split("/") if path.strip("/") else []
+    for i in range(1, len(segments)):
+        placeholder = _ID_SEGMENTS.get(segments[i - 1])
+        if placeholder is not None and segments[i] not in _ID_SEGMENTS:
+            segments[i] = placeholder
+    return "/" + "/".join(segments)
+
+
+class _Series:
+    __slots__ = ("count", "seconds_sum", "seconds_max", "buckets", "statuses", "bytes_sent", "bytes_received")
+
+    def __init__(self, bucket_count: int):
+        self.count = 0
+        self.seconds_sum = 0.0
+        self.seconds_max = 0.0
+        self.buckets = [0] * bucket_count  # per-bucket (non-cumulative) counts
+        self.statuses = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+
+class HttpMetrics:
+    """
+    Request metrics shared by any number of clients.
+
+    Latency is measured from the request hook to the end of the response
+    body (the response hook reads the body, which these clients do anyway),
+    so it covers what the caller waits for. Requests that fail before a
+    response (connection errors, timeouts) are not recorded.
+
+    :param buckets: Upper bounds (seconds) of the latency histogram buckets.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # (service, method, path template) -> _Series
+        self._lock = threading.Lock()
+
+    def event_hooks(self, service: str) -> dict:
+        """httpx event_hooks recording into this object under a service label."""
+
+        async def on_request(request):
+            request.extensions[_STARTED] = time.perf_counter()
+
+        async def on_response(response):
+            await response.aread()
+            request = response.request
+            started = request.extensions.get(_STARTED)
+            if started is None:
+                return
+            sent = int(request.headers.get("content-length") or 0)
+            path = normalize_path(request.url.raw_path.decode("ascii", "replace"))
+            self.record(service, request.method, path, response.status_code,
+                        time.perf_counter() - started, sent, len(response.content))
+
+        return {"request": [on_request], "response": [on_response]}
+
+    def record(self, service: str, method: str, path: str, status: int, seconds: float,
+               bytes_sent: int = 0, bytes_received: int = 0):
+        """Record one completed request."""
+        key = (service, method, path)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.buckets) + 1)
+            series.count += 1
+            series.seconds_sum += seconds
+            series.seconds_max = max(series.seconds_max, seconds)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series.buckets[i] += 1
+                    break
+            else:
+                series.buckets[-1] += 1
+            series.statuses[status] = series.statuses.get(status, 0) + 1
+            series.bytes_sent += bytes_sent
+            series.bytes_received += bytes_received
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self) -> dict:
+        """Return {"<service> <METHOD> <path template>": {count, seconds_sum,
+        seconds_max, seconds_avg, buckets {le: cumulative count}, statuses
+        {code: count}, bytes_sent, bytes_received}}, slowest total first."""
+        with self._lock:
+            items = [(key, series, list(series.buckets), dict(series.statuses))
+                     for key, series in self._series.items()]
+        result = {}
+        for (service, method, path), series, buckets, statuses in sorted(items, key=lambda i: -i[1].seconds_sum):
+            cumulative, running = {}, 0
+            for bound, count in zip(self.buckets + (float("inf"),), buckets):
+                running += count
+                cumulative[bound] = running
+            result[f"{service} {method} {path}"] = {
+                "count": series.count,
+                "seconds_sum": series.seconds_sum,
+                "seconds_max": series.seconds_max,
+                "seconds_avg": series.seconds_sum / series.count if series.count else 0.0,
+                "buckets": cumulative,
+                "statuses": statuses,
+                "bytes_sent": series.bytes_sent,
+                "bytes_received": series.bytes_received,
+            }
+        return result
+
+    def render_prometheus(self, prefix: str = "glueops_http") -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        with self._lock:
+            items = sorted((key, list(s.buckets), dict(s.statuses), s.seconds_sum, s.count, s.bytes_sent,
+                            s.bytes_received) for key, s in self._series.items())
+        duration, responses, sent, received = [], [], [], []
+        for (service, method, path), buckets, statuses, seconds_sum, count, bytes_sent, bytes_received in items:
+            labels = f'service="{_escape(service)}",method="{_escape(method)}",path="{_escape(path)}"'
+            running = 0
+            for bound, bucket in zip(self.buckets + (float("inf"),), buckets):
+                running += bucket
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                duration.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="{le}"}} {running}')
+            duration.append(f"{prefix}_request_duration_seconds_sum{{{labels}}} {seconds_sum}")
+            duration.append(f"{prefix}_request_duration_seconds_count{{{labels}}} {count}")
+            for code, n in sorted(statuses.items()):
+                responses.append(f'{prefix}_responses_total{{{labels},code="{code}"}} {n}')
+            sent.append(f"{prefix}_request_bytes_total{{{labels}}} {bytes_sent}")
+            received.append(f"{prefix}_response_bytes_total{{{labels}}} {bytes_received}")
+        lines = [
+            f"# HELP {prefix}_request_duration_seconds Request latency until the response body is read.",
+            f"# TYPE {prefix}_request_duration_seconds histogram",
+            *duration,
+            f"# HELP {prefix}_responses_total Responses by status code.",
+            f"# TYPE {prefix}_responses_total counter",
+            *responses,
+            f"# HELP {prefix}_request_bytes_total Request body bytes sent.",
+            f"# TYPE {prefix}_request_bytes_total counter",
+            *sent,
+            f"# HELP {prefix}_response_bytes_total Response body bytes received.",
+            f"# TYPE {prefix}_response_bytes_total counter",
+            *received,
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
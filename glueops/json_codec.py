@@ -0,0 +1,103 @@
+"""JSON encoding/decoding through the fastest installed backend.
+
+Uses orjson if installed, else msgspec, else the standard library. The HTTP
+clients decode response bodies with loads() and setup_logging.JsonFormatter
+encodes every record with dumps().
+
+The standard-library backend encodes exactly like a plain json.dumps(obj)
+(", "/": " separators, non-ASCII escaped), so log lines are unchanged unless a
+fast backend is installed. orjson and msgspec produce compact JSON with
+non-ASCII characters left as UTF-8.
+
+Neither orjson nor msgspec is a dependency: `pip install orjson` to speed up
+large responses (e.g. /cluster/resources on big Proxmox clusters) and chatty
+logging.
+
+Usage:
+    from glueops import json_codec
+
+    data = json_codec.loads(response.content)
+    line = json_codec.dumps({"message": "hello"})
+    json_codec.BACKEND  # "orjson", "msgspec" or "json"
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _json_loads(data):
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> str:
+    return json.dumps(obj)
+
+
+def _compact_json_dumps(obj) -> str:
+    """Stdlib fallback for values the fast encoders reject, matching their output format."""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+_BACKENDS = {"json": (_json_loads, _json_dumps)}
+
+if msgspec is not None:
+    _msgspec_encoder = msgspec.json.Encoder()
+
+    def _msgspec_loads(data):
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def _msgspec_dumps(obj) -> str:
+        try:
+            return _msgspec_encoder.encode(obj).decode()
+        except (TypeError, OverflowError):
+            return _compact_json_dumps(obj)  # e.g. ints beyond 64 bits
+
+    _BACKENDS["msgspec"] = (_msgspec_loads, _msgspec_dumps)
+
+if orjson is not None:
+    def _orjson_dumps(obj) -> str:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            return _compact_json_dumps(obj)  # e.g. ints beyond 64 bits, non-str dict keys
+
+    _BACKENDS["orjson"] = (orjson.loads, _orjson_dumps)
+
+BACKEND = next(name for name in ("orjson", "msgspec", "json") if name in _BACKENDS)
+_loads, _dumps = _BACKENDS[BACKEND]
+
+
+def available_backends() -> list:
+    """Names of the installed backends, fastest first."""
+    return [name for name in ("orjson", "msgspec", "json") if name in _BACKENDS]
+
+
+def use_backend(name: str):
+    """Switch every caller to an installed backend ("orjson", "msgspec", "json")."""
+    global BACKEND, _loads, _dumps
+    if name not in _BACKENDS:
+        raise ValueError(f"JSON backend {name!r} is not installed; available: {', '.join(available_backends())}")
+    BACKEND = name
+    _loads, _dumps = _BACKENDS[name]
+
+
+def loads(data):
+    """Decode JSON from bytes or str. Raises ValueError on invalid input."""
+    return _loads(data)
+
+
+def dumps(obj) -> str:
+    """Encode obj as JSON text (compact with orjson/msgspec, json.dumps defaults otherwise)."""
+    return _dumps(obj)
@@ -0,0 +1,59 @@
+"""Defer importing heavy dependencies until they are first used.
+
+httpx, requests, boto3, kubernetes and cryptography each take tens to
+hundreds of milliseconds to import, which short-lived jobs pay even when they
+never touch the module that needs them. lazy_import() returns a stand-in that
+imports the real module on its first attribute access:
+
+    from glueops.lazy_import import lazy_import
+
+    httpx = lazy_import("httpx")
+
+    def fetch(url):
+        return httpx.get(url)  # httpx is imported here, once
+
+After that first access the stand-in holds the module's attributes itself,
+so hot paths pay nothing extra; attributes the module gains later (e.g. a
+submodule imported afterwards) are still found through the real module.
+A missing dependency still fails at import time, as a plain import would.
+Annotations that name the module (e.g. `-> httpx.Response`) must be strings,
+or they import it when the function is defined.
+"""
+
+import importlib
+import importlib.util
+import sys
+import types
+
+
+class _LazyModule(types.ModuleType):
+    def __getattr__(self, attr):
+        # only reached until the first load: the real module's attributes are
+        # then bound onto the stand-in, so later lookups are plain attribute reads
+        name = self.__name__
+        module = sys.modules.get(name) or importlib.import_module(name)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+    def __dir__(self):
+        return dir(importlib.import_module(self.__name__))
+
+    def __repr__(self):
+        return f"<lazy module {self.__name__!r}>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Return `name` itself if it is already imported, else a stand-in that
+    imports it on first attribute access.
+
+    :param name: Absolute module name, e.g. "httpx" or "cryptography.x509".
+    :raises ModuleNotFoundError: when the top-level package is not installed.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    top_level = name.partition(".")[0]
+    if top_level not in sys.modules and importlib.util.find_spec(top_level) is None:
+        raise ModuleNotFoundError(f"No module named {top_level!r}", name=top_level)
+    return _LazyModule(name)
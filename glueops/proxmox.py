@@ -8,7 +8,7 @@ Requires Proxmox VE 8.4+ when using ensure_image_cached (qcow2 via the
 "import" content type of download-url).
 
 Usage:
-    from glueops.proxmox import ProxmoxClient, build_cloudinit_iso
+    from glueops.proxmox import ClusterSnapshot, ProxmoxClient, build_cloudinit_iso
 
     client = ProxmoxClient(
         host="pve.example.com",
@@ -17,37 +17,134 @@ Usage:
         storage="local-zfs",
     )
     vms = await client.list_vms_by_tags(["my-app", "my-tenant"])
+
+    snapshot = ClusterSnapshot(client, ttl=30)  # one fetch for many tag queries
+    vms = await client.list_vms_by_tags(["my-app", "my-tenant"], snapshot=snapshot)
 """
 
 import asyncio
 import base64
+import collections
+import heapq
 import io
 import ipaddress
+import itertools
 import os
+import random
 import re
+import tempfile
+import time
 import urllib.parse
 
-import httpx
-import pycdlib
+from glueops import checksum_tools, json_codec, setup_logging
+from glueops.lazy_import import lazy_import
+from glueops.nocloud_iso import write_nocloud_iso
 
-from glueops import setup_logging
+httpx = lazy_import("httpx")
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 logger = setup_logging.configure(level=LOG_LEVEL)
 
 
-def build_cloudinit_iso(user_data: bytes, meta_data: bytes) -> bytes:
-    """Build a cloud-init NoCloud (cidata) ISO from user-data and meta-data."""
+def cloudinit_iso_name(prefix: str, user_data: bytes, meta_data: bytes, digest_length: int = 24) -> str:
+    """Content-addressed ISO filename, "<prefix>-<digest>.iso", where digest is
+    the SHA-224 of user-data and meta-data (length-framed, so moving bytes
+    between the two files changes it). Identical seeds get identical names,
+    which is what lets ensure_cloudinit_iso skip rebuilding and re-uploading."""
+    seed = b"".join([len(user_data).to_bytes(8, "big"), user_data, meta_data])
+    return f"{prefix}-{checksum_tools.compute_sha224_bytes(seed)[:digest_length]}.iso"
+
+
+def _write_cloudinit_iso_pycdlib(fp, user_data: bytes, meta_data: bytes):
+    import pycdlib  # fallback writer only; kept off the import path of glueops.proxmox
+
     iso = pycdlib.PyCdlib()
     iso.new(vol_ident="cidata", rock_ridge="1.09")
     iso.add_fp(io.BytesIO(user_data), length=len(user_data), iso_path="/USERDATA;1", rr_name="user-data")
     iso.add_fp(io.BytesIO(meta_data), length=len(meta_data), iso_path="/METADATA;1", rr_name="meta-data")
-    buf = io.BytesIO()
-    iso.write_fp(buf)
+    iso.write_fp(fp)
     iso.close()
+
+
+def write_cloudinit_iso(fp, user_data: bytes, meta_data: bytes, use_pycdlib: bool = False):
+    """Write a cloud-init NoCloud (cidata) ISO into fp, a seekable binary file
+    object (BytesIO, SpooledTemporaryFile, open file, ...).
+
+    fp is overwritten from offset 0 and truncated to the ISO's length, so one
+    buffer can be reused across builds; it is left positioned at 0, ready to
+    pass to upload_iso.
+
+    :param use_pycdlib: build with pycdlib instead of the template writer in
+        glueops.nocloud_iso (same bytes, much slower; kept as a fallback).
+    """
+    fp.seek(0)
+    if use_pycdlib:
+        _write_cloudinit_iso_pycdlib(fp, user_data, meta_data)
+    else:
+        write_nocloud_iso(fp, user_data, meta_data)
+    fp.truncate()
+    fp.seek(0)
+
+
+def build_cloudinit_iso(user_data: bytes, meta_data: bytes, use_pycdlib: bool = False) -> bytes:
+    """Build a cloud-init NoCloud (cidata) ISO from user-data and meta-data."""
+    buf = io.BytesIO()
+    write_cloudinit_iso(buf, user_data, meta_data, use_pycdlib=use_pycdlib)
     return buf.getvalue()
 
 
+def build_cloudinit_iso_file(user_data: bytes, meta_data: bytes, max_memory: int = 1024 * 1024,
+                             use_pycdlib: bool = False):
+    """Build a cloud-init NoCloud ISO into a SpooledTemporaryFile (in memory up
+    to max_memory bytes, then on disk) positioned at 0. upload_iso streams it
+    without copying; close it once uploaded."""
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    try:
+        write_cloudinit_iso(spool, user_data, meta_data, use_pycdlib=use_pycdlib)
+    except BaseException:
+        spool.close()
+        raise
+    return spool
+
+
+class _UploadStream:
+    """Read-only file view over a bytes-like object or a binary file object,
+    handed to httpx's multipart encoder by upload_iso.
+
+    Buffers are read as memoryview slices (no copies); files are read through
+    in chunks. fileno() is deliberately not exposed, so httpx sizes the body
+    with seek/tell — on a SpooledTemporaryFile fileno() would force a
+    rollover to disk.
+    """
+
+    def __init__(self, source):
+        if isinstance(source, (bytearray, memoryview)):
+            self._view = memoryview(source).cast("B")
+            self._file = None
+        else:
+            self._view = None
+            self._file = source
+        self._pos = 0
+
+    def read(self, size: int = -1):
+        if self._file is not None:
+            return self._file.read(size)
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        chunk = self._view[self._pos:end]
+        self._pos = end
+        return chunk
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if self._file is not None:
+            return self._file.seek(offset, whence)
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self._pos, os.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._file.tell() if self._file is not None else self._pos
+
+
 def _decode_agent_output(data: str) -> str:
     # QGA returns out-data/err-data base64-encoded; PVE passes them through undecoded
     try:
@@ -56,6 +153,381 @@ def _decode_agent_output(data: str) -> str:
         return data
 
 
+async def _gather_or_cancel(aws):
+    """Like asyncio.gather, but the first failure cancels the remaining
+    awaitables (and waits for them) before propagating."""
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class _Stage:
+    """Holds a pipeline-stage semaphore and a per-node semaphore together
+    (node first, so a busy node doesn't hold stage slots while it waits)."""
+
+    def __init__(self, stage: asyncio.Semaphore, node: asyncio.Semaphore):
+        self._stage = stage
+        self._node = node
+
+    async def __aenter__(self):
+        await self._node.acquire()
+        try:
+            await self._stage.acquire()
+        except BaseException:
+            self._node.release()
+            raise
+
+    async def __aexit__(self, *exc):
+        self._stage.release()
+        self._node.release()
+
+
+class _TaskWaiter:
+    __slots__ = ("future", "starttime", "interval", "max_interval", "next_poll", "misses", "refs")
+
+    def __init__(self, future, starttime, interval, max_interval, next_poll):
+        self.future = future
+        self.starttime = starttime
+        self.interval = interval
+        self.max_interval = max_interval
+        self.next_poll = next_poll
+        self.misses = 0
+        self.refs = 1
+
+
+class _TaskWatcher:
+    """Multiplexes poll_task waiters onto one polling loop per node.
+
+    Each poll is a single GET /nodes/{node}/tasks (source=all, since = the
+    oldest watched task's start time) that resolves every finished waiter on
+    that node at once, so request volume scales with nodes, not tasks. Each
+    waiter keeps its own backoff schedule; a node is polled whenever any of
+    its waiters is due. A task missing from the listing for more than
+    `fallback_after` polls (listing truncated by `limit`, or not yet indexed)
+    is checked individually via its /status endpoint. A listed task is done
+    once it has an endtime; its status is read as the exit status only then,
+    since running tasks may list any status (or none). A failed listing counts
+    as a missed poll for every waiter; a failed /status check fails only the
+    waiter it was for.
+
+    Bound to one event loop; ProxmoxClient recreates it for a new loop.
+    """
+
+    fallback_after = 2
+
+    def __init__(self, client, loop):
+        self.loop = loop
+        self._client = client
+        self._waiters = {}  # node -> {upid: _TaskWaiter}
+        self._pollers = {}  # node -> asyncio.Task
+        self._wakeups = {}  # node -> asyncio.Event
+
+    def watch(self, upid: str, initial_interval: float, max_interval: float) -> asyncio.Future:
+        node = upid.split(":")[1]
+        waiters = self._waiters.setdefault(node, {})
+        waiter = waiters.get(upid)
+        if waiter is not None:
+            waiter.refs += 1
+            waiter.interval = min(waiter.interval, initial_interval)
+            waiter.max_interval = min(waiter.max_interval, max_interval)
+        else:
+            waiter = _TaskWaiter(self.loop.create_future(), int(upid.split(":")[4], 16),
+                                 initial_interval, max_interval, self.loop.time())
+            waiters[upid] = waiter
+        if node in self._pollers:
+            self._wakeups[node].set()
+        else:
+            self._wakeups[node] = asyncio.Event()
+            self._pollers[node] = self.loop.create_task(self._poll(node))
+        return waiter.future
+
+    def unwatch(self, upid: str):
+        waiters = self._waiters.get(upid.split(":")[1], {})
+        waiter = waiters.get(upid)
+        if waiter is None:
+            return
+        waiter.refs -= 1
+        if waiter.refs <= 0:
+            del waiters[upid]
+            waiter.future.cancel()
+
+    async def aclose(self):
+        pollers = list(self._pollers.values())
+        for poller in pollers:
+            poller.cancel()
+        await asyncio.gather(*pollers, return_exceptions=True)
+        for waiters in self._waiters.values():
+            for waiter in waiters.values():
+                waiter.future.cancel()
+        self._waiters.clear()
+
+    @staticmethod
+    def _resolve(waiter: _TaskWaiter, status: str, data: dict):
+        if waiter.future.done():
+            return
+        if status != "OK":
+            waiter.future.set_exception(RuntimeError(f"Proxmox task failed: {data}"))
+        else:
+            waiter.future.set_result(None)
+
+    async def _poll(self, node: str):
+        waiters = self._waiters[node]
+        wakeup = self._wakeups[node]
+        try:
+            while waiters:
+                due = min(w.next_poll for w in waiters.values())
+                delay = due - self.loop.time()
+                if delay > 0:
+                    wakeup.clear()
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                watched = dict(waiters)
+                await self._poll_once(node, watched)
+                for upid, waiter in watched.items():
+                    if waiter.future.done():
+                        if waiters.get(upid) is waiter:
+                            del waiters[upid]
+                        continue
+                    waiter.next_poll = self.loop.time() + waiter.interval
+                    waiter.interval = min(waiter.interval * 2, waiter.max_interval)
+        finally:
+            del self._pollers[node]
+            del self._wakeups[node]
+
+    async def _poll_once(self, node: str, watched: dict):
+        try:
+            tasks = await self._client._get(
+                f"/nodes/{node}/tasks", pinned=True, source="all",
+                since=min(w.starttime for w in watched.values()),
+                limit=max(50, 2 * len(watched)),
+            )
+        except Exception as e:
+            logger.debug(f"Listing tasks on {node} failed, retrying on backoff: {e}",
+                         extra={"log_key": f"task-list-failed:{node}"})
+            tasks = None
+        listed = {t.get("upid"): t for t in tasks or []}
+        for upid, waiter in watched.items():
+            if waiter.future.done():
+                continue
+            task = listed.get(upid)
+            if task is None:
+                waiter.misses += 1
+                if waiter.misses > self.fallback_after:
+                    encoded = urllib.parse.quote(upid, safe="")
+                    try:
+                        data = await self._client._get(f"/nodes/{node}/tasks/{encoded}/status", pinned=True)
+                    except Exception as e:
+                        if not waiter.future.done():
+                            waiter.future.set_exception(e)
+                        continue
+                    if data["status"] == "stopped":
+                        self._resolve(waiter, data.get("exitstatus"), data)
+                continue
+            waiter.misses = 0
+            # finished tasks carry an endtime (as in PVE's own task index);
+            # status is only the exit status once that is set
+            if task.get("endtime") is not None:
+                self._resolve(waiter, task.get("status"), task)
+
+
+class _ReadyWatcher:
+    """Drives readiness checks (ProxmoxClient._probe_readiness) for many
+    booting VMs from one scheduler; backs watch_ready and provision_many.
+
+    Each VM is on its own backoff: the first check runs immediately, then the
+    interval grows 1.5x from initial_interval up to max_interval. At most
+    `concurrency` checks are in flight across all VMs, and VMs can be added
+    while others are being watched. watch() returns a future resolved with
+    the VM's result (a failure or timeout is reported in "error", not
+    raised); cancelling that future stops the VM's checks.
+    """
+
+    def __init__(self, client, timeout: float, initial_interval: float = 0.5, max_interval: float = 10.0,
+                 concurrency: int = 16, skip_interface_prefixes=("lo", "docker", "br-", "veth")):
+        self.loop = asyncio.get_running_loop()
+        self._client = client
+        self.timeout = timeout
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.skip_interface_prefixes = skip_interface_prefixes
+        self._limit = asyncio.Semaphore(concurrency)
+        self._due = []  # heap of (next check at, insertion order, state)
+        self._order = itertools.count()
+        self._futures = set()  # unresolved watch() futures
+        self._checks = set()
+        self._wakeup = asyncio.Event()
+        self._scheduler = None
+
+    def watch(self, node: str, vmid) -> asyncio.Future:
+        now = self.loop.time()
+        future = self.loop.create_future()
+        state = {
+            "node": node, "vmid": str(vmid), "agent_up": False, "cloud_init": False, "ip": None,
+            "exec_fallback": False, "interval": self.initial_interval, "started": now,
+            "future": future, "check": None,
+        }
+        self._futures.add(future)
+        future.add_done_callback(lambda _: self._forget(state))
+        heapq.heappush(self._due, (now, next(self._order), state))
+        if self._scheduler is None or self._scheduler.done():
+            self._scheduler = self.loop.create_task(self._schedule())
+        else:
+            self._wakeup.set()
+        return future
+
+    async def aclose(self):
+        tasks = list(self._checks) + ([self._scheduler] if self._scheduler is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for future in list(self._futures):
+            future.cancel()
+        self._due.clear()
+
+    def _forget(self, state: dict):
+        self._futures.discard(state["future"])
+        check = state["check"]
+        if state["future"].cancelled() and check is not None and not check.done():
+            check.cancel()
+
+    def _finish(self, state: dict, error: Exception = None):
+        if not state["future"].done():
+            state["future"].set_result({"node": state["node"], "vmid": state["vmid"], "ip": state["ip"],
+                                        "error": error, "seconds": self.loop.time() - state["started"]})
+
+    async def _check(self, state: dict):
+        try:
+            async with self._limit:
+                ready = await self._client._probe_readiness(state, self.skip_interface_prefixes)
+        except Exception as e:
+            self._finish(state, e)
+            return
+        finally:
+            self._checks.discard(state["check"])
+            self._wakeup.set()
+        if state["future"].done():
+            return
+        if ready:
+            self._finish(state)
+        elif self.loop.time() - state["started"] >= self.timeout:
+            phase = "cloud-init" if state["agent_up"] and not state["cloud_init"] else \
+                "IPv4 address" if state["agent_up"] else "guest agent"
+            self._finish(state, TimeoutError(f"VM {state['vmid']}: {phase} not ready after {self.timeout:.0f}s"))
+        else:
+            heapq.heappush(self._due, (self.loop.time() + state["interval"], next(self._order), state))
+            state["interval"] = min(state["interval"] * 1.5, self.max_interval)
+
+    async def _schedule(self):
+        while self._due or self._checks:
+            if self._due and self._due[0][0] <= self.loop.time():
+                _, _, state = heapq.heappop(self._due)
+                if state["future"].done():
+                    continue
+                task = state["check"] = self.loop.create_task(self._check(state))
+                self._checks.add(task)
+                task.add_done_callback(self._checks.discard)
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._due[0][0] - self.loop.time() if self._due else None)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Statuses worth retrying for idempotent reads: gateway/proxy errors, and
+# pveproxy's 59x for a node it could not reach. A plain 500 is not retried —
+# PVE uses it for ordinary failures ("does not exist", "already running").
+_RETRY_STATUSES = frozenset({502, 503, 504, 595, 596, 599})
+
+
+class _AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one endpoint.
+
+    Every request that completes fast and without an overload error adds
+    1/limit (about +1 per window of `limit` requests); one that fails with a
+    _RETRY_STATUSES status or transport error, or takes longer than
+    latency_threshold, halves the limit. Only requests sent after the last
+    cut can cut again, so a burst of failures from one overloaded window
+    halves the limit once instead of collapsing it to the minimum.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, latency_threshold: float):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.latency_threshold = latency_threshold
+        self.in_flight = 0
+        self._waiters = collections.deque()
+        self._last_decrease = 0.0
+
+    async def acquire(self):
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just as we were cancelled; pass it on
+                self.in_flight -= 1
+                self._wake()
+            raise
+
+    def release(self, started: float, ok, timed: bool = True):
+        """Free a slot and adapt the limit.
+
+        :param started: time.monotonic() when the request was sent.
+        :param ok: False on an overload error, None for no signal (cancelled).
+        :param timed: whether the request's latency reflects endpoint load
+            (not for uploads, whose duration is mostly transfer time).
+        """
+        self.in_flight -= 1
+        now = time.monotonic()
+        if ok is None:
+            pass
+        elif not ok or (timed and now - started > self.latency_threshold):
+            if started >= self._last_decrease and self.limit > self.minimum:
+                self.limit = max(self.minimum, self.limit / 2)
+                self._last_decrease = now
+                logger.info(f"Proxmox endpoint overloaded ({'error' if not ok else f'{now - started:.1f}s response'}); "
+                            f"concurrency limit now {int(self.limit)}", extra={"log_key": "proxmox-overloaded"})
+        elif self.limit < self.maximum:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+class _Endpoint:
+    """One pveproxy the client can send requests to, with its own connection
+    pool and adaptive concurrency limit."""
+
+    __slots__ = ("host", "http", "limiter", "down_until", "failures")
+
+    def __init__(self, host: str, limiter: _AdaptiveLimiter):
+        self.host = host
+        self.http = None
+        self.limiter = limiter
+        self.down_until = 0.0  # time.monotonic() before which reads skip this endpoint
+        self.failures = 0
+
+
 class ProxmoxClient:
     """
     Async client for one Proxmox VE cluster, authenticated with an API token.
@@ -69,35 +541,100 @@ class ProxmoxClient:
     :param download_server_url: Base URL hosting <image>.qcow2 files; required
         only for ensure_image_cached. Note the PVE node performs the fetch.
     :param download_timeout: Seconds to wait for image downloads (default 1800).
+    :param content_cache_ttl: Seconds a storage content listing (import/iso
+        volids per node) is reused before being re-fetched (default 30). Kept
+        current by this client's own downloads, uploads, and deletions.
+    :param hosts: Additional cluster node endpoints (no scheme, same port and
+        token). Read-only GETs are spread round-robin over host + hosts — a
+        /nodes/<name>/... read prefers that node's own endpoint once
+        discovered — and fail over to the next endpoint on transport errors.
+        Writes, uploads, and task polling always go to host.
+    :param discover_endpoints: Before the first spread read, add every online
+        node's address from /cluster/status to the endpoints (default False).
+        With verify_ssl, node certificates must be valid for those addresses.
+    :param limits: httpx.Limits for each endpoint's connection pool
+        (default: httpx's defaults).
+    :param http2: Use HTTP/2 to each endpoint (requires httpx[http2]).
+    :param endpoint_cooldown: Seconds a failed endpoint is skipped for reads
+        (default 30); it is still tried as a last resort.
+    :param transport: httpx transport used instead of the network (e.g.
+        httpx.MockTransport in tests); limits and http2 then do not apply.
+    :param metrics: glueops.http_metrics.HttpMetrics to record per-endpoint
+        latency, status codes and bytes into (service "proxmox"); off by default.
+    :param max_concurrency: Upper bound on in-flight requests per endpoint
+        (default 64). Within it the limit adapts AIMD-style, starting at
+        initial_concurrency (default 16): it grows while requests succeed
+        quickly and halves on 502/503/504/59x responses, transport errors, or
+        responses slower than latency_threshold seconds (default 5), never
+        going below min_concurrency (default 2).
+    :param retries: Retries for GET requests that fail with one of those
+        statuses or a transport error (default 3), after a jittered
+        exponential backoff starting at retry_backoff seconds (default 0.5).
+        Other requests are never retried, since they may not be idempotent.
     """
 
     def __init__(self, host, token_id, token_secret, storage, port=8006,
-                 verify_ssl=True, download_server_url=None, download_timeout=1800.0):
+                 verify_ssl=True, download_server_url=None, download_timeout=1800.0,
+                 content_cache_ttl=30.0, hosts=None, discover_endpoints=False, limits=None,
+                 http2=False, endpoint_cooldown=30.0, transport=None, metrics=None,
+                 max_concurrency=64, initial_concurrency=16, min_concurrency=2, latency_threshold=5.0,
+                 retries=3, retry_backoff=0.5):
         self.host = host
         self.port = port
         self.storage = storage
         self.verify_ssl = verify_ssl
         self.download_server_url = download_server_url
         self.download_timeout = download_timeout
+        self.content_cache_ttl = content_cache_ttl
         self._token_id = token_id
         self._token_secret = token_secret
-        self._http = None
+        self.limits = limits
+        self.http2 = http2
+        self.endpoint_cooldown = endpoint_cooldown
+        self._transport = transport
+        self.metrics = metrics
+        self.max_concurrency = max_concurrency
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.latency_threshold = latency_threshold
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self._primary = self._new_endpoint(host)
+        self._endpoints = [self._primary] + [self._new_endpoint(h) for h in dict.fromkeys(hosts or ()) if h != host]
+        self._node_endpoints = {}  # node name -> its own endpoint, once discovered
+        self._next_endpoint = 0
+        self._discover = discover_endpoints
+        self._discovery = None  # in-flight or finished lazy discovery
+        self._watcher = None
+        self._content_cache = {}  # (node, storage, content) -> (expires at, set of volids)
+        self._listings = {}  # (node, storage, content) -> in-flight content listing task
+        self._inflight = {}  # single-flight key -> in-flight download/upload task
+        self._claimed_vmids = set()  # vmids allocated by provision_many but not yet created
         if not verify_ssl:
             logger.warning(f"SSL verification disabled for Proxmox host {host}")
 
     # --- HTTP plumbing -----------------------------------------------------
 
-    def _base(self) -> str:
-        return f"https://{self.host}:{self.port}/api2/json"
+    def _base(self, endpoint: _Endpoint = None) -> str:
+        host = (endpoint or self._primary).host
+        if ":" in host and not host.startswith("["):
+            host = f"[{host}]"  # IPv6 address from /cluster/status
+        return f"https://{host}:{self.port}/api2/json"
 
-    def _client(self) -> httpx.AsyncClient:
-        if self._http is None or self._http.is_closed:
+    def _client(self, endpoint: _Endpoint = None) -> "httpx.AsyncClient":
+        endpoint = endpoint or self._primary
+        if endpoint.http is None or endpoint.http.is_closed:
             headers = {"Authorization": f"PVEAPIToken={self._token_id}={self._token_secret}"}
-            self._http = httpx.AsyncClient(verify=self.verify_ssl, timeout=60.0, headers=headers)
-        return self._http
+            options = {"http2": self.http2, "transport": self._transport}
+            if self.limits is not None:
+                options["limits"] = self.limits
+            if self.metrics is not None:
+                options["event_hooks"] = self.metrics.event_hooks("proxmox")
+            endpoint.http = httpx.AsyncClient(verify=self.verify_ssl, timeout=60.0, headers=headers, **options)
+        return endpoint.http
 
     @staticmethod
-    def _check(response: httpx.Response):
+    def _check(response: "httpx.Response"):
         if response.status_code >= 400:
             raise httpx.HTTPStatusError(
                 f"Proxmox API {response.request.method} {response.request.url.path} "
@@ -106,32 +643,148 @@ class ProxmoxClient:
                 response=response,
             )
 
-    async def _get(self, path, **params):
-        r = await self._client().get(f"{self._base()}{path}", params=params or None)
+    async def _request(self, method: str, path: str, *, params=None, data=None, files=None, json=None,
+                       pinned: bool = False):
+        """Send one API request and return its "data". GETs that fail with a
+        _RETRY_STATUSES status or transport error are retried with jittered
+        exponential backoff; other methods get exactly one attempt."""
+        attempts = self.retries + 1 if method == "GET" else 1
+        for attempt in range(1, attempts + 1):
+            try:
+                r = await self._send(method, path, params, data, files, json, pinned)
+            except httpx.TransportError as e:
+                if attempt == attempts:
+                    raise
+                error = f"{type(e).__name__}: {e}"
+            else:
+                if r.status_code not in _RETRY_STATUSES or attempt == attempts:
+                    break
+                error = f"HTTP {r.status_code}"
+            delay = random.uniform(0, self.retry_backoff * 2 ** (attempt - 1))
+            logger.warning(f"Proxmox API {method} {path} failed ({error}); retry {attempt}/{self.retries} in {delay:.2f}s",
+                           extra={"log_key": f"proxmox-retry:{method}"})
+            await asyncio.sleep(delay)
         self._check(r)
-        return r.json()["data"]
+        return json_codec.loads(r.content)["data"]
+
+    async def _send(self, method, path, params, data, files, json, pinned) -> "httpx.Response":
+        """One attempt: unpinned GETs go to the next healthy endpoint, failing
+        over to the others on transport errors; everything else goes to the
+        primary host. Each request holds a slot of its endpoint's limiter."""
+        if method != "GET" or pinned:
+            endpoints = [self._primary]
+        else:
+            endpoints = await self._read_endpoints(path)
+        for attempt, endpoint in enumerate(endpoints, start=1):
+            await endpoint.limiter.acquire()
+            started, ok = time.monotonic(), None
+            try:
+                r = await self._client(endpoint).request(
+                    method, f"{self._base(endpoint)}{path}", params=params or None, data=data, files=files, json=json,
+                )
+                ok = r.status_code not in _RETRY_STATUSES
+            except httpx.TransportError as e:
+                ok = False
+                if len(endpoints) == 1:
+                    raise
+                self._endpoint_failed(endpoint, e)
+                if attempt == len(endpoints):
+                    raise
+                continue
+            finally:
+                endpoint.limiter.release(started, ok, timed=files is None)
+            endpoint.failures = 0
+            endpoint.down_until = 0.0
+            return r
+
+    async def _get(self, path, *, pinned: bool = False, **params):
+        return await self._request("GET", path, params=params, pinned=pinned)
 
     async def _post(self, path, data=None, files=None):
-        r = await self._client().post(f"{self._base()}{path}", data=data, files=files)
-        self._check(r)
-        return r.json()["data"]
+        return await self._request("POST", path, data=data, files=files)
 
     async def _put(self, path, data):
-        r = await self._client().put(f"{self._base()}{path}", data=data)
-        self._check(r)
-        return r.json()["data"]
+        return await self._request("PUT", path, data=data)
 
     async def _delete(self, path, **params):
-        r = await self._client().delete(f"{self._base()}{path}", params=params or None)
-        self._check(r)
-        return r.json()["data"]
+        return await self._request("DELETE", path, params=params)
+
+    # --- Endpoints -----------------------------------------------------------
+
+    async def _read_endpoints(self, path: str) -> list:
+        """Endpoints to try for a read, in order: the node's own endpoint for
+        /nodes/<name>/... when known and healthy, otherwise healthy endpoints
+        round-robin; endpoints cooling down after a failure go last."""
+        if self._discover:
+            if self._discovery is None:
+                self._discovery = asyncio.ensure_future(self._discover_once())
+            await asyncio.shield(self._discovery)
+        if len(self._endpoints) == 1:
+            return self._endpoints
+        start = self._next_endpoint % len(self._endpoints)
+        self._next_endpoint += 1
+        ordered = self._endpoints[start:] + self._endpoints[:start]
+        if path.startswith("/nodes/"):
+            own = self._node_endpoints.get(path.split("/", 3)[2])
+            if own is not None:
+                ordered.remove(own)
+                ordered.insert(0, own)
+        now = time.monotonic()
+        healthy = [e for e in ordered if e.down_until <= now]
+        cooling = sorted((e for e in ordered if e.down_until > now), key=lambda e: e.down_until)
+        return healthy + cooling
+
+    def _new_endpoint(self, host: str) -> _Endpoint:
+        limiter = _AdaptiveLimiter(self.initial_concurrency, self.min_concurrency, self.max_concurrency,
+                                   self.latency_threshold)
+        return _Endpoint(host, limiter)
+
+    def _endpoint_failed(self, endpoint: _Endpoint, error: Exception):
+        endpoint.failures += 1
+        endpoint.down_until = time.monotonic() + self.endpoint_cooldown
+        logger.warning(f"Proxmox endpoint {endpoint.host} failed ({type(error).__name__}: {error}); "
+                       f"skipping it for reads for {self.endpoint_cooldown:.0f}s",
+                       extra={"log_key": f"endpoint-failed:{endpoint.host}"})
+
+    async def _discover_once(self):
+        try:
+            await self.discover_endpoints()
+        except (httpx.HTTPStatusError, httpx.TransportError) as e:
+            logger.warning(f"Proxmox endpoint discovery failed, using configured endpoints only: {e}")
+
+    async def discover_endpoints(self) -> list:
+        """Add every online node's address from /cluster/status to the read
+        endpoints (the primary host stays first); return all endpoint hosts."""
+        status = await self._get("/cluster/status", pinned=True) or []
+        known = {e.host: e for e in self._endpoints}
+        for entry in status:
+            if entry.get("type") != "node" or not entry.get("online") or not entry.get("ip"):
+                continue
+            endpoint = known.get(entry["ip"])
+            if endpoint is None:
+                endpoint = known[entry["ip"]] = self._new_endpoint(entry["ip"])
+                self._endpoints.append(endpoint)
+            self._node_endpoints[entry["name"]] = endpoint
+        hosts = [e.host for e in self._endpoints]
+        logger.info(f"Proxmox endpoints: {', '.join(hosts)}")
+        return hosts
 
     async def aclose(self):
-        if self._http is not None and not self._http.is_closed:
-            await self._http.aclose()
+        if self._watcher is not None:
+            await self._watcher.aclose()
+            self._watcher = None
+        for endpoint in self._endpoints:
+            if endpoint.http is not None and not endpoint.http.is_closed:
+                await endpoint.http.aclose()
 
     # --- Tasks ---------------------------------------------------------------
 
+    def _task_watcher(self) -> "_TaskWatcher":
+        loop = asyncio.get_running_loop()
+        if self._watcher is None or self._watcher.loop is not loop:
+            self._watcher = _TaskWatcher(self, loop)
+        return self._watcher
+
     async def poll_task(self, upid: str, timeout: float = 600.0,
                         initial_interval: float = 0.25, max_interval: float = 3.0):
         """Wait for a Proxmox task (UPID) to finish; raise on failure or timeout.
@@ -142,28 +795,30 @@ class ProxmoxClient:
         one — a VM delete alone is two tasks. Long tasks (image downloads) settle
         at max_interval, so the extra requests are negligible for them.
 
+        Polling is shared: concurrent waiters on the same node are resolved
+        together from one GET /nodes/{node}/tasks per poll (see _TaskWatcher),
+        so 50 VMs starting at once cost one poll loop per node, not 50.
+
         On timeout the task is best-effort stopped so an abandoned task (e.g. a
         wedged download-url holding its target file) doesn't block retries with 409s.
         """
         task_node = upid.split(":")[1]
         encoded = urllib.parse.quote(upid, safe="")
-        deadline = asyncio.get_running_loop().time() + timeout
-        interval = initial_interval
-        while True:
-            data = await self._get(f"/nodes/{task_node}/tasks/{encoded}/status")
-            if data["status"] == "stopped":
-                if data.get("exitstatus") != "OK":
-                    raise RuntimeError(f"Proxmox task failed: {data}")
-                return
-            if asyncio.get_running_loop().time() >= deadline:
-                try:
-                    await self._delete(f"/nodes/{task_node}/tasks/{encoded}")
-                    logger.warning(f"Stopped stalled Proxmox task {upid} after {timeout:.0f}s")
-                except Exception as e:
-                    logger.error(f"Failed to stop stalled Proxmox task {upid}: {e}")
-                raise TimeoutError(f"Proxmox task {upid} still running after {timeout:.0f}s; check the task log in the Proxmox UI")
-            await asyncio.sleep(interval)
-            interval = min(interval * 2, max_interval)
+        watcher = self._task_watcher()
+        finished = watcher.watch(upid, initial_interval, max_interval)
+        try:
+            await asyncio.wait_for(asyncio.shield(finished), timeout)
+            return
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            watcher.unwatch(upid)
+        try:
+            await self._delete(f"/nodes/{task_node}/tasks/{encoded}")
+            logger.warning(f"Stopped stalled Proxmox task {upid} after {timeout:.0f}s")
+        except Exception as e:
+            logger.error(f"Failed to stop stalled Proxmox task {upid}: {e}")
+        raise TimeoutError(f"Proxmox task {upid} still running after {timeout:.0f}s; check the task log in the Proxmox UI")
 
     # --- Images & ISOs ---------------------------------------------------------
 
@@ -172,11 +827,58 @@ class ProxmoxClient:
         caller can claim the same id; retry VM creation on conflict."""
         return await self._get("/cluster/nextid")
 
+    async def _storage_volids(self, node: str, content: str, refresh: bool = False) -> set:
+        """Return the volids of `content` type on this client's storage on a
+        node, from the index cache unless stale or refresh is set."""
+        key = (node, self.storage, content)
+        cached = self._content_cache.get(key)
+        if cached is not None and not refresh and cached[0] > time.monotonic():
+            return cached[1]
+        # Concurrent refreshes of the same listing share one GET
+        listing = self._listings.get(key)
+        if listing is None:
+            listing = asyncio.ensure_future(self._get(f"/nodes/{node}/storage/{self.storage}/content", content=content))
+            self._listings[key] = listing
+            listing.add_done_callback(lambda task: self._listings.pop(key, None))
+        return self._index_volumes(node, content, await asyncio.shield(listing))
+
+    def _index_volumes(self, node: str, content: str, listing) -> set:
+        volids = {v["volid"] for v in listing or []}
+        self._content_cache[(node, self.storage, content)] = (time.monotonic() + self.content_cache_ttl, volids)
+        return volids
+
+    def _note_volume(self, node: str, content: str, volid: str, present: bool):
+        cached = self._content_cache.get((node, self.storage, content))
+        if cached is None:
+            return
+        if present:
+            cached[1].add(volid)
+        else:
+            cached[1].discard(volid)
+
+    async def _has_volume(self, node: str, content: str, volid: str) -> bool:
+        # Only positives are served from the cache: a miss is re-listed, so a
+        # stale index can delay noticing a deletion but never cause a re-download.
+        cached = self._content_cache.get((node, self.storage, content))
+        if cached is not None and cached[0] > time.monotonic() and volid in cached[1]:
+            return True
+        return volid in await self._storage_volids(node, content, refresh=True)
+
+    def invalidate_storage_cache(self, node: str = None):
+        """Drop the storage index cache (for one node, or all nodes)."""
+        for key in [k for k in self._content_cache if node is None or k[0] == node]:
+            del self._content_cache[key]
+
     async def ensure_image_cached(self, node: str, image: str, checksum=None,
                                   checksum_algorithm: str = "sha256", cache_name=None) -> str:
         """Download <image>.qcow2 from download_server_url onto the node's storage
         (content type "import") unless already present. Requires PVE 8.4+.
 
+        Concurrent calls for the same (node, cache_name) in this process share
+        one download (single-flight) instead of each POSTing download-url and
+        racing into 409s. Presence is answered from the storage index cache
+        when it has a fresh positive entry (see content_cache_ttl).
+
         :param checksum: expected digest; PVE verifies the download and fails the
             task on mismatch, so a corrupted or truncated fetch never gets cached.
         :param cache_name: store the volume under this name instead of <image>.
@@ -190,11 +892,36 @@ class ProxmoxClient:
         if not self.download_server_url:
             raise ValueError("download_server_url is required for ensure_image_cached")
         cache_name = cache_name or image
-        content = await self._get(f"/nodes/{node}/storage/{self.storage}/content", content="import")
         volid = f"{self.storage}:import/{cache_name}.qcow2"
-        if volid in {v["volid"] for v in (content or [])}:
+        if await self._has_volume(node, "import", volid):
             logger.info(f"Image {cache_name} already cached on {node}")
             return cache_name
+        return await self._single_flight(
+            ("download", node, cache_name),
+            lambda: self._download_image(node, image, cache_name, volid, checksum, checksum_algorithm),
+            f"Image {cache_name} download already running in this process for {node}, joining it",
+        )
+
+    async def _single_flight(self, key, start, joined_message: str):
+        """Run start() once per key at a time: concurrent callers with the same
+        key await the one in-flight task instead of starting their own."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(start())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._single_flight_finished(key, done))
+        else:
+            logger.info(joined_message)
+        return await asyncio.shield(task)
+
+    def _single_flight_finished(self, key, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here so an unjoined failure isn't logged as never retrieved
+
+    async def _download_image(self, node: str, image: str, cache_name: str, volid: str,
+                              checksum, checksum_algorithm: str) -> str:
         logger.info(f"Downloading {image} to {node} as {cache_name}")
         try:
             data = {
@@ -207,41 +934,94 @@ class ProxmoxClient:
                 data["checksum-algorithm"] = checksum_algorithm
             upid = await self._post(f"/nodes/{node}/storage/{self.storage}/download-url", data=data)
             await self.poll_task(upid, timeout=self.download_timeout)
+            self._note_volume(node, "import", volid, present=True)
             return cache_name
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 409:
-                # Another download already in progress — wait for it to complete.
-                # download-url renames a temp file on completion, so appearance in
-                # the content listing means the download finished intact.
+                # Another process's download already in progress — wait for it to
+                # complete. download-url renames a temp file on completion, so
+                # appearance in the content listing means the download finished intact.
                 deadline = asyncio.get_running_loop().time() + self.download_timeout
                 logger.info(f"Image {image} download already in progress on {node}, waiting...")
                 while asyncio.get_running_loop().time() < deadline:
                     await asyncio.sleep(5)
-                    content = await self._get(f"/nodes/{node}/storage/{self.storage}/content", content="import")
-                    if volid in {v["volid"] for v in (content or [])}:
+                    if volid in await self._storage_volids(node, "import", refresh=True):
                         return cache_name
+                    logger.debug(f"Image {image} still downloading on {node}", extra={"log_key": f"image-wait:{node}:{volid}"})
                 raise TimeoutError(
                     f"Timed out after {self.download_timeout:.0f}s waiting for {image} on {node}; the download "
                     f"started by another request may have stalled or failed — check that node's task log, then retry."
                 )
             raise
 
-    async def upload_iso(self, node: str, iso_filename: str, iso_bytes: bytes) -> str:
-        """Upload ISO bytes to the node's storage. Overwrites any same-named file."""
+    async def upload_iso(self, node: str, iso_filename: str, iso, skip_existing: bool = False) -> str:
+        """Upload an ISO to the node's storage. Overwrites any same-named file.
+
+        :param iso: the ISO as bytes, bytearray or memoryview, or a binary file
+            object positioned at its start (e.g. from build_cloudinit_iso_file or
+            write_cloudinit_iso); streamed to the API without intermediate copies.
+        :param skip_existing: don't upload if a volume with this name already
+            exists on the node's storage. Only safe for content-addressed names
+            (see cloudinit_iso_name), where the name identifies the bytes.
+        """
+        volid = f"{self.storage}:iso/{iso_filename}"
+        if skip_existing and await self._has_volume(node, "iso", volid):
+            logger.info(f"ISO {iso_filename} already on {node}, skipping upload")
+            return iso_filename
+        body = iso if isinstance(iso, bytes) else _UploadStream(iso)
         upid = await self._post(
             f"/nodes/{node}/storage/{self.storage}/upload",
             data={"content": "iso"},
-            files={"filename": (iso_filename, io.BytesIO(iso_bytes), "application/octet-stream")},
+            files={"filename": (iso_filename, body, "application/octet-stream")},
         )
         await self.poll_task(upid)
+        self._note_volume(node, "iso", volid, present=True)
         return iso_filename
 
+    async def ensure_cloudinit_iso(self, node: str, prefix: str, user_data: bytes, meta_data: bytes) -> str:
+        """Content-addressed cloud-init ISO: name it by cloudinit_iso_name and
+        build/upload it only if that volume isn't already on the node's storage.
+        VMs with identical user-data and meta-data share one ISO, and concurrent
+        calls in this process for the same ISO share one upload.
+
+        A shared ISO must only be removed with skip_in_use (the default of
+        eject_and_delete_iso and delete_isos_matching): a plain delete would
+        pull it from under every other VM attached to it. Deletion can still
+        race a provision that found the ISO present but hasn't created its VM
+        yet; create_vm then fails on the missing volume and should be retried
+        from this call.
+
+        :returns: the ISO filename (pass to create_vm's iso_filename param).
+        """
+        iso_filename = cloudinit_iso_name(prefix, user_data, meta_data)
+        volid = f"{self.storage}:iso/{iso_filename}"
+        if await self._has_volume(node, "iso", volid):
+            logger.info(f"ISO {iso_filename} already on {node}, reusing it")
+            return iso_filename
+
+        async def upload():
+            with build_cloudinit_iso_file(user_data, meta_data) as iso:
+                return await self.upload_iso(node, iso_filename, iso)
+
+        return await self._single_flight(
+            ("upload", node, iso_filename), upload,
+            f"ISO {iso_filename} upload already running in this process for {node}, joining it",
+        )
+
     async def _delete_iso_volid(self, node: str, volid: str):
-        result = await self._delete(f"/nodes/{node}/storage/{self.storage}/content/{urllib.parse.quote(volid, safe='')}")
+        """Delete a volume; one that is already gone counts as deleted."""
+        try:
+            result = await self._delete(f"/nodes/{node}/storage/{self.storage}/content/{urllib.parse.quote(volid, safe='')}")
+        except httpx.HTTPStatusError as e:
+            if "does not exist" not in e.response.text:
+                raise
+            logger.info(f"{volid} on {node} already gone, nothing to delete")
+            result = None
         if isinstance(result, str) and result.startswith("UPID:"):
             await self.poll_task(result)
+        self._note_volume(node, volid.split(":", 1)[-1].split("/", 1)[0], volid, present=False)
 
-    async def eject_and_delete_iso(self, node: str, vmid: str, iso_filename: str):
+    async def eject_and_delete_iso(self, node: str, vmid: str, iso_filename: str, skip_in_use: bool = True):
         """Best-effort: detach the ide2 cdrom, then delete the ISO volume.
 
         If the eject fails (VM gone, guest-locked tray, hotplug disabled) the
@@ -249,16 +1029,59 @@ class ProxmoxClient:
         onboot the next hypervisor boot would fail on the missing volume), and
         the same filename may meanwhile belong to a successor VM's fresh ISO.
         Leftovers are cleaned by delete_isos_matching, whose in-use check makes
-        deletion safe."""
+        deletion safe.
+
+        :param skip_in_use: after the eject, keep the volume if any VM still
+            references it (or if the reference scan fails). On by default, since
+            content-addressed ISOs from ensure_cloudinit_iso may be shared by
+            other VMs; pass False only for an ISO private to this VM, to skip
+            the cluster-wide reference scan."""
+        if not await self._eject_iso(node, vmid, iso_filename):
+            return
+        volid = f"{self.storage}:iso/{iso_filename}"
+        if skip_in_use:
+            try:
+                referenced = await self.referenced_iso_volids()
+            except Exception as e:
+                logger.warning(f"Keeping ISO {iso_filename}: reference scan failed: {e}")
+                return
+            if volid in referenced:
+                logger.info(f"Keeping ISO {iso_filename}: still referenced by another VM")
+                return
+        try:
+            await self._delete_iso_volid(node, volid)
+        except Exception as e:
+            logger.error(f"Failed to delete ISO {iso_filename}: {e}")
+
+    async def _eject_iso(self, node: str, vmid: str, iso_filename: str) -> bool:
         try:
             await self.update_vm_config(node, vmid, ide2="none,media=cdrom")
+            return True
         except Exception as e:
             logger.error(f"Failed to eject ISO from VM {vmid}: {e}; leaving {iso_filename} for the orphan sweep")
-            return
+            return False
+
+    async def _delete_unreferenced_isos(self, candidates):
+        """Delete the (node, iso filename) pairs no VM references, from one
+        referenced_iso_volids scan — for batches, instead of one scan per ISO.
+        Keeps everything if the scan fails."""
         try:
-            await self._delete_iso_volid(node, f"{self.storage}:iso/{iso_filename}")
+            referenced = await self.referenced_iso_volids()
         except Exception as e:
-            logger.error(f"Failed to delete ISO {iso_filename}: {e}")
+            logger.warning(f"Keeping {len(candidates)} shared ISOs: reference scan failed: {e}")
+            return
+
+        async def delete(node, iso_filename):
+            volid = f"{self.storage}:iso/{iso_filename}"
+            if volid in referenced:
+                logger.info(f"Keeping ISO {iso_filename}: still referenced by another VM")
+                return
+            try:
+                await self._delete_iso_volid(node, volid)
+            except Exception as e:
+                logger.error(f"Failed to delete ISO {iso_filename}: {e}")
+
+        await asyncio.gather(*[delete(node, iso_filename) for node, iso_filename in sorted(candidates)])
 
     @staticmethod
     def _collect_iso_volids(values, referenced: set):
@@ -269,7 +1092,7 @@ class ProxmoxClient:
                 if ":iso/" in part:
                     referenced.add(part.split("=", 1)[-1].strip())
 
-    async def referenced_iso_volids(self) -> set:
+    async def referenced_iso_volids(self, concurrency: int = 16, per_node_concurrency: int = 4) -> set:
         """Return every iso volid referenced by any qemu VM cluster-wide: current
         config values, PENDING values (GET /config would return pending-applied
         values, hiding e.g. an ISO whose eject is still pending), and every
@@ -281,34 +1104,138 @@ class ProxmoxClient:
         Fails CLOSED: raises RuntimeError if any node is offline or any per-VM
         fetch fails, because an incomplete reference set must not authorize
         deletion (a shared-storage ISO could be referenced by an unreachable
-        node's VM)."""
+        node's VM). See scan_iso_references for the concurrency limits."""
+        scan = await self.scan_iso_references(concurrency=concurrency, per_node_concurrency=per_node_concurrency)
+        return scan["referenced"]
+
+    async def scan_iso_references(self, concurrency: int = 16, per_node_concurrency: int = 4) -> dict:
+        """Run the referenced_iso_volids scan and return it with its cost.
+
+        Per-VM fetches (pending, snapshot list, one config per snapshot) run
+        concurrently, bounded by `concurrency` requests in flight cluster-wide
+        and `per_node_concurrency` per node (each node's pveproxy/pvedaemon
+        serves its own VMs' config reads, so the per-node cap is what keeps one
+        busy node from being flooded). The first failed fetch cancels the rest
+        and propagates: same fail-closed rule as a sequential scan.
+
+        :returns: {"referenced": set of volids, "nodes": int, "vms": int,
+            "requests": int, "seconds": float}.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        limit = asyncio.Semaphore(concurrency)
+        node_limits = {}
         referenced = set()
+        stats = {"requests": 0, "vms": 0}
+
+        async def fetch(node, path, **params):
+            async with node_limits[node], limit:
+                stats["requests"] += 1
+                return await self._get(path, **params)
+
+        async def scan_snapshot(node, vmid, name):
+            snap_config = await fetch(node, f"/nodes/{node}/qemu/{vmid}/config", snapshot=name)
+            self._collect_iso_volids((snap_config or {}).values(), referenced)
+
+        async def scan_vm(node, vmid):
+            pending, snapshots = await _gather_or_cancel([
+                fetch(node, f"/nodes/{node}/qemu/{vmid}/pending"),
+                fetch(node, f"/nodes/{node}/qemu/{vmid}/snapshot"),
+            ])
+            for entry in pending or []:
+                self._collect_iso_volids([entry.get("value"), entry.get("pending")], referenced)
+            names = [s.get("name") for s in snapshots or []]
+            await _gather_or_cancel([
+                scan_snapshot(node, vmid, name) for name in names if name and name != "current"
+            ])
+
+        async def scan_node(node):
+            vms = await fetch(node, f"/nodes/{node}/qemu") or []
+            stats["vms"] += len(vms)
+            await _gather_or_cancel([scan_vm(node, str(vm["vmid"])) for vm in vms])
+
         nodes = await self.list_nodes()
+        stats["requests"] += 1
         offline = [n["node"] for n in nodes if n.get("status") != "online"]
         if offline:
             raise RuntimeError(f"ISO reference scan incomplete: node(s) not online: {', '.join(offline)}")
         for n in nodes:
-            node = n["node"]
-            vms = await self.list_node_vms(node)
-            for vm in vms or []:
-                vmid = str(vm["vmid"])
-                pending = await self._get(f"/nodes/{node}/qemu/{vmid}/pending")
-                for entry in pending or []:
-                    self._collect_iso_volids([entry.get("value"), entry.get("pending")], referenced)
-                snapshots = await self._get(f"/nodes/{node}/qemu/{vmid}/snapshot")
-                for snap in snapshots or []:
-                    name = snap.get("name")
-                    if not name or name == "current":
-                        continue
-                    snap_config = await self._get(f"/nodes/{node}/qemu/{vmid}/config", snapshot=name)
-                    self._collect_iso_volids((snap_config or {}).values(), referenced)
-        return referenced
+            node_limits[n["node"]] = asyncio.Semaphore(per_node_concurrency)
+        await _gather_or_cancel([scan_node(n["node"]) for n in nodes])
+        seconds = loop.time() - started
+        logger.info(f"ISO reference scan: {len(nodes)} node(s), {stats['vms']} VM(s), "
+                    f"{stats['requests']} request(s) in {seconds:.2f}s")
+        return {
+            "referenced": referenced,
+            "nodes": len(nodes),
+            "vms": stats["vms"],
+            "requests": stats["requests"],
+            "seconds": seconds,
+        }
 
     async def _storage_is_shared(self, node: str) -> bool:
         status = await self.get_storage_status(node)
         return bool(status.get("shared"))
 
-    async def prune_import_images(self, filename_regex: str, keep) -> int:
+    async def _list_storage_everywhere(self, content: str, node_stats: dict):
+        """List this storage's `content` volumes on every node in parallel.
+
+        Nodes where the storage is not present/available are skipped. Returns
+        ([(node, volumes)] in list_nodes order, shared) where shared is read
+        from the first node that listed successfully (False if unknown: per-node
+        deletion is correct for both local and shared storage)."""
+        loop = asyncio.get_running_loop()
+
+        async def list_node(node):
+            started = loop.time()
+            try:
+                volumes = await self._get(f"/nodes/{node}/storage/{self.storage}/content", content=content)
+                self._index_volumes(node, content, volumes)
+                listed = True
+            except (httpx.HTTPStatusError, httpx.TransportError):
+                volumes, listed = None, False  # storage not present/available on this node
+            node_stats[node] = {
+                "listed": listed, "list_seconds": loop.time() - started,
+                "candidates": 0, "deleted": 0, "failed": 0, "delete_seconds": 0.0,
+            }
+            return node, listed, volumes or []
+
+        nodes = [n["node"] for n in await self.list_nodes()]
+        listings = [(node, volumes) for node, listed, volumes in
+                    await asyncio.gather(*(list_node(node) for node in nodes)) if listed]
+        shared = False
+        if listings:
+            try:
+                shared = await self._storage_is_shared(listings[0][0])
+            except (httpx.HTTPStatusError, httpx.TransportError):
+                shared = False  # assume local: per-node deletion covers both cases
+        return listings, shared
+
+    async def _delete_volumes(self, candidates, node_stats: dict, concurrency: int, per_node_concurrency: int) -> list:
+        """Delete (node, volid) pairs through a bounded worker pool: at most
+        `concurrency` deletions in flight overall and `per_node_concurrency` per
+        node (each delete may also poll its task). Never raises; returns
+        [(node, volid, error or None)] in candidate order."""
+        loop = asyncio.get_running_loop()
+        limit = asyncio.Semaphore(concurrency)
+        node_limits = {node: asyncio.Semaphore(per_node_concurrency) for node, _ in candidates}
+
+        async def delete(node, volid):
+            async with node_limits[node], limit:
+                started = loop.time()
+                try:
+                    await self._delete_iso_volid(node, volid)
+                    error = None
+                except Exception as e:
+                    error = e
+                node_stats[node]["delete_seconds"] += loop.time() - started
+            node_stats[node]["failed" if error else "deleted"] += 1
+            return node, volid, error
+
+        return await asyncio.gather(*(delete(node, volid) for node, volid in candidates))
+
+    async def prune_import_images(self, filename_regex: str, keep, concurrency: int = 8,
+                                  per_node_concurrency: int = 2) -> int:
         """Delete cached import volumes matching filename_regex except `keep`.
 
         Checksum-keyed cache names mean every image release leaves the previous
@@ -322,26 +1249,34 @@ class ProxmoxClient:
 
         :param keep: base name (no .qcow2) of the volume to preserve, or an
             iterable of such base names.
-        :returns: number of volumes deleted.
+        :returns: number of volumes deleted (see sweep_import_images for the
+            per-node breakdown and the concurrency limits).
         """
+        sweep = await self.sweep_import_images(filename_regex, keep, concurrency=concurrency,
+                                               per_node_concurrency=per_node_concurrency)
+        return sweep["deleted"]
+
+    async def sweep_import_images(self, filename_regex: str, keep, concurrency: int = 8,
+                                  per_node_concurrency: int = 2) -> dict:
+        """prune_import_images, returning a report instead of a count.
+
+        Node listings run in parallel; deletions run through a worker pool of
+        `concurrency`, at most `per_node_concurrency` per node.
+
+        :returns: {"deleted": int, "failed": int, "seconds": float, "nodes":
+            {node: {"listed", "list_seconds", "candidates", "deleted", "failed",
+            "delete_seconds"}}}.
+        """
+        started = asyncio.get_running_loop().time()
         pattern = re.compile(rf"^{re.escape(self.storage)}:import/(?:{filename_regex})$")
         keep_names = {keep} if isinstance(keep, str) else set(keep)
         keep_volids = {f"{self.storage}:import/{name}.qcow2" for name in keep_names}
+        node_stats = {}
+        listings, shared = await self._list_storage_everywhere("import", node_stats)
         seen = set()
-        deleted = 0
-        shared = None
-        for n in await self.list_nodes():
-            node = n["node"]
-            try:
-                content = await self._get(f"/nodes/{node}/storage/{self.storage}/content", content="import")
-            except (httpx.HTTPStatusError, httpx.TransportError):
-                continue
-            if shared is None:
-                try:
-                    shared = await self._storage_is_shared(node)
-                except (httpx.HTTPStatusError, httpx.TransportError):
-                    shared = False
-            for v in content or []:
+        candidates = []
+        for node, content in listings:
+            for v in content:
                 volid = v["volid"]
                 if volid in keep_volids or not pattern.match(volid):
                     continue
@@ -349,15 +1284,22 @@ class ProxmoxClient:
                 if key in seen:
                     continue
                 seen.add(key)
-                try:
-                    await self._delete_iso_volid(node, volid)
-                    logger.info(f"Pruned stale import image {volid} from {node}")
-                    deleted += 1
-                except Exception as e:
-                    logger.error(f"Failed to prune import image {volid}: {e}")
-        return deleted
+                candidates.append((node, volid))
+                node_stats[node]["candidates"] += 1
+        for node, volid, error in await self._delete_volumes(candidates, node_stats, concurrency, per_node_concurrency):
+            if error:
+                logger.error(f"Failed to prune import image {volid}: {error}")
+            else:
+                logger.info(f"Pruned stale import image {volid} from {node}")
+        return {
+            "deleted": sum(s["deleted"] for s in node_stats.values()),
+            "failed": sum(s["failed"] for s in node_stats.values()),
+            "seconds": asyncio.get_running_loop().time() - started,
+            "nodes": node_stats,
+        }
 
-    async def delete_isos_matching(self, filename_regex: str, skip_in_use: bool = True) -> int:
+    async def delete_isos_matching(self, filename_regex: str, skip_in_use: bool = True,
+                                   concurrency: int = 8, per_node_concurrency: int = 2) -> int:
         """Best-effort deletion of ISO volumes whose filename matches the regex,
         swept across every node's storage (VM purge never removes standalone iso
         content, so orphan cleanup needs an explicit sweep). Returns count deleted.
@@ -370,50 +1312,62 @@ class ProxmoxClient:
 
         On shared storage identical volids across nodes are one file (deduped);
         on local storage the same volid per node is a distinct file and each
-        node's copy is deleted separately."""
+        node's copy is deleted separately. See sweep_isos_matching for the
+        per-node breakdown and the concurrency limits."""
+        sweep = await self.sweep_isos_matching(filename_regex, skip_in_use=skip_in_use, concurrency=concurrency,
+                                               per_node_concurrency=per_node_concurrency)
+        return sweep["deleted"]
+
+    async def sweep_isos_matching(self, filename_regex: str, skip_in_use: bool = True,
+                                  concurrency: int = 8, per_node_concurrency: int = 2) -> dict:
+        """delete_isos_matching, returning a report instead of a count.
+
+        Node listings run in parallel; deletions run through a worker pool of
+        `concurrency`, at most `per_node_concurrency` per node. The same limits
+        bound the reference scan.
+
+        :returns: {"deleted": int, "failed": int, "skipped_in_use": int,
+            "seconds": float, "scan": scan_iso_references stats without the
+            volid set (None if no scan ran), "nodes": {node: {"listed",
+            "list_seconds", "candidates", "deleted", "failed", "delete_seconds"}}}.
+        """
+        started = asyncio.get_running_loop().time()
         pattern = re.compile(rf"^{re.escape(self.storage)}:iso/(?:{filename_regex})$")
-        shared = None
+        node_stats = {}
+        report = {"deleted": 0, "failed": 0, "skipped_in_use": 0, "seconds": 0.0, "scan": None, "nodes": node_stats}
+        listings, shared = await self._list_storage_everywhere("iso", node_stats)
         seen = set()
         candidates = []
-        for n in await self.list_nodes():
-            node = n["node"]
-            try:
-                content = await self._get(f"/nodes/{node}/storage/{self.storage}/content", content="iso")
-            except (httpx.HTTPStatusError, httpx.TransportError):
-                continue  # storage not present/available on this node
-            if shared is None:
-                try:
-                    shared = await self._storage_is_shared(node)
-                except (httpx.HTTPStatusError, httpx.TransportError):
-                    shared = False  # assume local: per-node deletion covers both cases
-            for v in content or []:
+        for node, content in listings:
+            for v in content:
                 volid = v["volid"]
                 key = volid if shared else (node, volid)
                 if key in seen or not pattern.match(volid):
                     continue
                 seen.add(key)
                 candidates.append((node, volid))
-        if not candidates:
-            return 0
-        if skip_in_use:
+                node_stats[node]["candidates"] += 1
+        if candidates and skip_in_use:
             try:
-                referenced = await self.referenced_iso_volids()
+                scan = await self.scan_iso_references(concurrency=concurrency, per_node_concurrency=per_node_concurrency)
             except Exception as e:
                 logger.warning(f"Skipping ISO sweep ({len(candidates)} candidate(s)): {e}")
-                return 0
-        else:
-            referenced = set()
-        deleted = 0
-        for node, volid in candidates:
-            if volid in referenced:
-                logger.warning(f"Skipping ISO {volid}: still referenced by a VM config, pending change, or snapshot")
-                continue
-            try:
-                await self._delete_iso_volid(node, volid)
-                deleted += 1
-            except Exception as e:
-                logger.error(f"Failed to delete ISO {volid}: {e}")
-        return deleted
+                candidates = []
+            else:
+                referenced = scan.pop("referenced")
+                report["scan"] = scan
+                for node, volid in candidates:
+                    if volid in referenced:
+                        logger.warning(f"Skipping ISO {volid}: still referenced by a VM config, pending change, or snapshot")
+                        report["skipped_in_use"] += 1
+                candidates = [(node, volid) for node, volid in candidates if volid not in referenced]
+        for node, volid, error in await self._delete_volumes(candidates, node_stats, concurrency, per_node_concurrency):
+            if error:
+                logger.error(f"Failed to delete ISO {volid}: {error}")
+        report["deleted"] = sum(s["deleted"] for s in node_stats.values())
+        report["failed"] = sum(s["failed"] for s in node_stats.values())
+        report["seconds"] = asyncio.get_running_loop().time() - started
+        return report
 
     # --- VM lifecycle ------------------------------------------------------------
 
@@ -521,35 +1475,26 @@ class ProxmoxClient:
         """Return the qemu VMs on one node (includes per-VM cpus/maxmem/status)."""
         return await self._get(f"/nodes/{node}/qemu") or []
 
-    async def list_vms_by_tags(self, required_tags: list) -> list:
-        """Return [{node, vmid, name, status}] for every qemu VM carrying all required_tags."""
-        resources = await self._get("/cluster/resources", type="vm")
-        required = {t.lower() for t in required_tags}
-        matches = []
-        for r in resources or []:
-            if r.get("type") != "qemu":
-                continue
-            # Proxmox accepts both ";" and "," as tag separators, and stores tags lowercased
-            vm_tags = {t.lower() for t in re.split(r"[;,]", r.get("tags") or "")}
-            if required.issubset(vm_tags):
-                matches.append({
-                    "node": r["node"],
-                    "vmid": str(r["vmid"]),
-                    "name": r.get("name", ""),
-                    "status": r.get("status", "unknown"),
-                })
-        return matches
+    async def list_vms_by_tags(self, required_tags: list, snapshot: "ClusterSnapshot" = None) -> list:
+        """Return [{node, vmid, name, status}] for every qemu VM carrying all required_tags.
+
+        :param snapshot: answer from this ClusterSnapshot (refreshed first if
+            older than its ttl) instead of fetching /cluster/resources.
+        """
+        if snapshot is None:
+            snapshot = ClusterSnapshot(self, ttl=0)
+            await snapshot.refresh()
+        else:
+            await snapshot.ensure_fresh()
+        return snapshot.vms_with_tags(required_tags)
 
     # --- Guest agent ------------------------------------------------------------
 
     async def agent_exec(self, node: str, vmid: str, command: list, timeout: float = 180.0) -> str:
         """Run a command in the guest via the QEMU guest agent; return its output."""
-        r = await self._client().post(
-            f"{self._base()}/nodes/{node}/qemu/{vmid}/agent/exec",
-            json={"command": command, "input-data": ""},
-        )
-        self._check(r)
-        pid = r.json()["data"]["pid"]
+        result = await self._request("POST", f"/nodes/{node}/qemu/{vmid}/agent/exec",
+                                     json={"command": command, "input-data": ""})
+        pid = result["pid"]
         deadline = asyncio.get_running_loop().time() + timeout
         while asyncio.get_running_loop().time() < deadline:
             result = await self._get(f"/nodes/{node}/qemu/{vmid}/agent/exec-status", pid=pid)
@@ -584,7 +1529,7 @@ class ProxmoxClient:
                 logger.info(f"VM {vmid}: cloud-init complete")
                 return
             except (RuntimeError, TimeoutError, httpx.HTTPStatusError, httpx.TransportError) as e:
-                logger.debug(f"VM {vmid}: cloud-init not ready: {e}")
+                logger.debug(f"VM {vmid}: cloud-init not ready: {e}", extra={"log_key": f"cloud-init-wait:{vmid}"})
             await asyncio.sleep(5)
         logger.warning(f"VM {vmid}: cloud-init did not complete within {cloudinit_timeout}s, continuing anyway")
 
@@ -601,23 +1546,451 @@ class ProxmoxClient:
         while loop.time() < end:
             try:
                 data = await self._get(f"/nodes/{node}/qemu/{vmid}/agent/network-get-interfaces")
-                for iface in data.get("result", []):
-                    iface_name = iface.get("name", "")
-                    if iface_name.startswith(tuple(skip_interface_prefixes)):
-                        continue
-                    for addr in iface.get("ip-addresses", []):
-                        if addr.get("ip-address-type") != "ipv4":
-                            continue
-                        try:
-                            ip = ipaddress.IPv4Address(addr.get("ip-address", ""))
-                        except ValueError:
-                            logger.warning(f"VM {vmid}: guest agent reported non-IPv4 string {addr.get('ip-address')!r}, skipping")
-                            continue
-                        if ip.is_loopback or ip.is_link_local or ip.is_unspecified:
-                            continue
-                        logger.info(f"VM {vmid}: found IPv4 {ip} on interface {iface_name}")
-                        return str(ip)
+                ip = self._pick_ipv4(vmid, data, skip_interface_prefixes)
+                if ip is not None:
+                    return ip
             except (httpx.HTTPStatusError, httpx.TransportError) as e:
-                logger.debug(f"VM {vmid}: guest agent network query not ready: {e}")
+                logger.debug(f"VM {vmid}: guest agent network query not ready: {e}", extra={"log_key": f"ipv4-wait:{vmid}"})
             await asyncio.sleep(5)
         raise RuntimeError(f"Could not determine IPv4 address for VM {vmid} within {timeout}s")
+
+    @staticmethod
+    def _pick_ipv4(vmid: str, data: dict, skip_interface_prefixes) -> str:
+        """Return the first usable IPv4 in a network-get-interfaces result, or None."""
+        for iface in (data or {}).get("result", []):
+            iface_name = iface.get("name", "")
+            if iface_name.startswith(tuple(skip_interface_prefixes)):
+                continue
+            for addr in iface.get("ip-addresses", []):
+                if addr.get("ip-address-type") != "ipv4":
+                    continue
+                try:
+                    ip = ipaddress.IPv4Address(addr.get("ip-address", ""))
+                except ValueError:
+                    logger.warning(f"VM {vmid}: guest agent reported non-IPv4 string {addr.get('ip-address')!r}, skipping",
+                                   extra={"log_key": f"non-ipv4:{vmid}"})
+                    continue
+                if ip.is_loopback or ip.is_link_local or ip.is_unspecified:
+                    continue
+                logger.info(f"VM {vmid}: found IPv4 {ip} on interface {iface_name}")
+                return str(ip)
+        return None
+
+    async def _probe_readiness(self, state: dict, skip_interface_prefixes) -> bool:
+        """One readiness check for a watch_ready entry; True once cloud-init has
+        finished and an IPv4 is known. Usually a single request: boot-finished
+        is read with agent/file-read (one GET, instead of agent_exec's POST plus
+        exec-status polling), and the interfaces are only fetched until an
+        address is found. Guests whose agent blocks file reads fall back to
+        agent_exec. An address seen before cloud-init finished only marks the
+        agent as up: cloud-init may reconfigure networking (static IP from
+        user-data, DHCP renew), so the IPv4 is read again once it is done."""
+        node, vmid = state["node"], state["vmid"]
+        if not state["cloud_init"]:
+            try:
+                if state["exec_fallback"]:
+                    await self.agent_exec(node, vmid, ["ls", "/var/lib/cloud/instance/boot-finished"], timeout=30)
+                else:
+                    await self._get(f"/nodes/{node}/qemu/{vmid}/agent/file-read",
+                                    file="/var/lib/cloud/instance/boot-finished")
+                state["cloud_init"] = True
+                state["ip"] = None
+                logger.info(f"VM {vmid}: cloud-init complete")
+            except httpx.HTTPStatusError as e:
+                if state["agent_up"] and not state["exec_fallback"] and "No such file" not in e.response.text:
+                    logger.info(f"VM {vmid}: guest agent file-read unavailable, checking cloud-init via exec")
+                    state["exec_fallback"] = True
+                if state["agent_up"] and state["ip"] is not None:
+                    return False
+            except (RuntimeError, TimeoutError, httpx.TransportError) as e:
+                logger.debug(f"VM {vmid}: cloud-init not ready: {e}", extra={"log_key": f"cloud-init-wait:{vmid}"})
+                return False
+        if state["ip"] is None:
+            try:
+                data = await self._get(f"/nodes/{node}/qemu/{vmid}/agent/network-get-interfaces")
+            except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                logger.debug(f"VM {vmid}: guest agent not ready: {e}", extra={"log_key": f"agent-wait:{vmid}"})
+                return False
+            if not state["agent_up"]:
+                state["agent_up"] = True
+                logger.info(f"VM {vmid}: guest agent up")
+            state["ip"] = self._pick_ipv4(vmid, data, skip_interface_prefixes)
+        return state["cloud_init"] and state["ip"] is not None
+
+    async def watch_ready(self, vms, timeout: float = 900.0, initial_interval: float = 0.5,
+                          max_interval: float = 10.0, concurrency: int = 16,
+                          skip_interface_prefixes=("lo", "docker", "br-", "veth")):
+        """Wait for many booting VMs at once; an async generator yielding each
+        VM as soon as its guest agent is up, cloud-init has finished, and it
+        has an IPv4 (the same checks as wait_for_cloud_init + get_vm_ipv4).
+
+        One scheduler (_ReadyWatcher) drives every VM's checks (at most
+        `concurrency` requests in flight), each VM on its own adaptive backoff:
+        the first check runs immediately, then the interval grows 1.5x from
+        initial_interval up to max_interval — fast boots are noticed within a
+        fraction of a second, slow ones settle at max_interval.
+
+        Unlike wait_for_cloud_init, which logs a warning and carries on when
+        cloud-init is slow, a VM whose cloud-init has not finished within
+        `timeout` is yielded with a TimeoutError.
+
+        :param vms: iterable of (node, vmid) pairs.
+        :param timeout: per-VM seconds before it is yielded with an error.
+        :yields: {"node", "vmid", "ip", "error" (None when ready), "seconds"}.
+        """
+        watcher = _ReadyWatcher(self, timeout, initial_interval, max_interval, concurrency, skip_interface_prefixes)
+        pending = {watcher.watch(node, vmid) for node, vmid in vms}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            await watcher.aclose()
+
+    # --- Batch provisioning -------------------------------------------------------
+
+    # Default in-flight limits per pipeline stage (see provision_many)
+    PROVISION_STAGE_LIMITS = {
+        "image": 4,
+        "iso": 8,
+        "create": 4,
+        "resize": 8,
+        "start": 8,
+        "ready": 64,
+    }
+
+    async def _claim_vmid(self, lock: asyncio.Lock, max_candidates: int = 1000) -> str:
+        """Allocate a vmid no other in-process provision holds. /cluster/nextid
+        is non-reserving, so concurrent creates would otherwise all get the same
+        id; candidates already claimed here are skipped and re-checked with
+        /cluster/nextid?vmid= (which errors with "already exists" if that id is
+        taken). Any other error is raised, and so is running out of candidates."""
+        async with lock:
+            first = int(await self.get_next_vmid())
+            for candidate in range(first, first + max_candidates):
+                if str(candidate) in self._claimed_vmids:
+                    continue
+                try:
+                    vmid = str(await self._get("/cluster/nextid", vmid=candidate))
+                except httpx.HTTPStatusError as e:
+                    if "already exists" in e.response.text:
+                        continue
+                    raise
+                self._claimed_vmids.add(vmid)
+                return vmid
+            raise RuntimeError(f"No free vmid among {max_candidates} candidates from {first}")
+
+    async def provision_many(self, specs, per_node_concurrency: int = 4, stage_limits: dict = None,
+                             wait_ready: bool = True, ready_timeout: float = 900.0, eject_iso: bool = False,
+                             create_retries: int = 3):
+        """Provision many VMs concurrently; an async generator yielding one result
+        per spec as each VM finishes (or fails), not in input order.
+
+        Each VM runs image caching and ISO upload together, then vmid allocation
+        + create_vm, resize_disk, start_vm and (with wait_ready) wait_for_cloud_init
+        + get_vm_ipv4 checks (as in watch_ready, failing after ready_timeout).
+        VMs overlap freely across stages — one VM's image import
+        runs while another boots — bounded per stage by stage_limits (merged over
+        PROVISION_STAGE_LIMITS) and, for every stage that does work on the node
+        (all but "ready"), by per_node_concurrency per node. Every started VM
+        in the batch is watched by one shared readiness scheduler, with the
+        "ready" limit as its readiness checks in flight. Image downloads
+        count against a per-node limit of their own, so a long download never
+        holds up create/start on its node, and only one VM per (node, image)
+        holds an image slot — the others wait on its fetch without one.
+
+        A spec is a dict with create_vm's arguments (node, vm_name, vcpus,
+        memory_mb, image, bridge, and optionally tags, vlan_tag, onboot, cpu,
+        description) plus:
+            user_data, meta_data: cloud-init seed contents (bytes).
+            iso_filename: defaults to "<vm_name>-cloudinit.iso"; ignored with
+                iso_prefix, which uses a shared content-addressed ISO instead
+                (ensure_cloudinit_iso).
+            disk_gb / disk_mb: optional resize_disk target.
+            checksum, cache_name: passed to ensure_image_cached (that stage runs
+                only when download_server_url is set; otherwise `image` must
+                already be cached on the node).
+
+        On failure the VM is cleaned up with eject_and_delete_iso + delete_vm
+        (an ISO uploaded for a VM that was never created is deleted directly).
+        Shared content-addressed ISOs (iso_prefix) are only ejected or detached
+        per VM; once the batch is done, the ones no VM references any more are
+        deleted after a single referenced_iso_volids scan, rather than one
+        cluster-wide scan per VM.
+        Closing the generator early (leaving the `async for`, aclose(), or
+        cancelling the consumer) cleans up the same way every VM still being
+        provisioned, after letting an upload or create already under way
+        finish, and every finished VM not yet yielded.
+
+        :param eject_iso: eject and delete the cloud-init ISO once the VM is
+            ready (the seed often embeds credentials).
+        :param create_retries: extra vmid allocations when another process
+            claims the same vmid first.
+        :yields: {"spec", "node", "vm_name", "vmid", "iso_filename", "ip",
+            "error" (None on success), "stage" (failed stage or None), "seconds"}.
+        """
+        limits = {**self.PROVISION_STAGE_LIMITS, **(stage_limits or {})}
+        stage_sems = {stage: asyncio.Semaphore(limit) for stage, limit in limits.items()}
+        node_sems = {}
+        ready_watcher = _ReadyWatcher(self, ready_timeout, concurrency=limits["ready"])
+        image_node_sems = {}  # downloads get their own per-node limit: they can run for many minutes
+        image_tasks = {}  # (node, cache name) -> the one ensure_image_cached run this batch shares
+        shared_isos = set()  # (node, iso filename) of shared ISOs ejected or detached this batch
+        vmid_lock = asyncio.Lock()
+        loop = asyncio.get_running_loop()
+
+        def stage(name, node):
+            node_sem = node_sems.setdefault(node, asyncio.Semaphore(per_node_concurrency))
+            return _Stage(stage_sems[name], node_sem)
+
+        async def create(spec, node, image, iso_filename):
+            for attempt in range(create_retries + 1):
+                vmid = await self._claim_vmid(vmid_lock)
+                try:
+                    await self.create_vm(
+                        node=node, vmid=vmid, vm_name=spec["vm_name"], vcpus=spec["vcpus"],
+                        memory_mb=spec["memory_mb"], image=image, iso_filename=iso_filename,
+                        bridge=spec["bridge"], tags=spec.get("tags"), vlan_tag=spec.get("vlan_tag"),
+                        onboot=spec.get("onboot", True), cpu=spec.get("cpu", "x86-64-v2-AES"),
+                        description=spec.get("description"),
+                    )
+                    return vmid
+                except httpx.HTTPStatusError as e:
+                    if "already exists" not in e.response.text or attempt == create_retries:
+                        raise
+                    logger.info(f"vmid {vmid} taken by another client, retrying {spec['vm_name']}")
+                finally:
+                    self._claimed_vmids.discard(vmid)
+
+        async def provision(spec):
+            node = spec["node"]
+            shared_iso = bool(spec.get("iso_prefix"))
+            result = {
+                "spec": spec, "node": node, "vm_name": spec["vm_name"], "vmid": None,
+                "iso_filename": None, "ip": None, "error": None, "stage": None, "seconds": 0.0,
+            }
+            started = loop.time()
+            current = None
+            steps = []  # side-effecting steps (ISO upload, VM create) cleanup must see finish first
+
+            async def side_effect(coro):
+                # shielded so that cancelling the provision lets the upload/create
+                # finish and land in result, where cleanup can find and undo it
+                task = asyncio.ensure_future(coro)
+                steps.append(task)
+                return await asyncio.shield(task)
+
+            async def clean_up():
+                await asyncio.gather(*steps, return_exceptions=True)
+                await self._cleanup_provision(result, shared_iso, shared_isos)
+
+            try:
+                async def cache_image():
+                    if not self.download_server_url:
+                        return spec["image"]
+                    key = (node, spec.get("cache_name") or spec["image"])
+                    task = image_tasks.get(key)
+                    if task is None:
+                        # one slot per distinct image, held by the VM that fetches it;
+                        # the others wait on that fetch without taking a slot
+                        async def fetch():
+                            async with stage_sems["image"], image_node_sems.setdefault(
+                                    node, asyncio.Semaphore(per_node_concurrency)):
+                                return await self.ensure_image_cached(
+                                    node, spec["image"], checksum=spec.get("checksum"),
+                                    cache_name=spec.get("cache_name"))
+
+                        task = image_tasks[key] = asyncio.ensure_future(fetch())
+                    return await asyncio.shield(task)
+
+                async def upload_iso():
+                    async with stage("iso", node):
+                        if shared_iso:
+                            result["iso_filename"] = await self.ensure_cloudinit_iso(
+                                node, spec["iso_prefix"], spec["user_data"], spec["meta_data"])
+                            return
+                        iso_filename = spec.get("iso_filename") or f"{spec['vm_name']}-cloudinit.iso"
+                        with build_cloudinit_iso_file(spec["user_data"], spec["meta_data"]) as iso:
+                            await self.upload_iso(node, iso_filename, iso)
+                        result["iso_filename"] = iso_filename
+
+                current = "image/iso"
+                image, _ = await _gather_or_cancel([cache_image(), side_effect(upload_iso())])
+                current = "create"
+
+                async def create_vm():
+                    result["vmid"] = await create(spec, node, image, result["iso_filename"])
+
+                async with stage("create", node):
+                    await side_effect(create_vm())
+                if spec.get("disk_gb") is not None or spec.get("disk_mb") is not None:
+                    current = "resize"
+                    async with stage("resize", node):
+                        await self.resize_disk(node, result["vmid"], disk_gb=spec.get("disk_gb"),
+                                               disk_mb=spec.get("disk_mb"))
+                current = "start"
+                async with stage("start", node):
+                    await self.start_vm(node, result["vmid"])
+                if wait_ready:
+                    current = "ready"
+                    ready = await ready_watcher.watch(node, result["vmid"])
+                    if ready["error"] is not None:
+                        raise ready["error"]
+                    result["ip"] = ready["ip"]
+                if eject_iso and shared_iso:
+                    # deleted, if no VM still uses it, by one reference scan for the whole batch
+                    if await self._eject_iso(node, result["vmid"], result["iso_filename"]):
+                        shared_isos.add((node, result["iso_filename"]))
+                elif eject_iso:
+                    # uploaded by this provision for this VM alone: no reference scan needed
+                    await self.eject_and_delete_iso(node, result["vmid"], result["iso_filename"], skip_in_use=False)
+                logger.info(f"Provisioned {spec['vm_name']} as VM {result['vmid']} on {node}")
+            except Exception as e:
+                result["error"], result["stage"] = e, current
+                logger.error(f"Provisioning {spec['vm_name']} on {node} failed at {current}: {e}")
+                await clean_up()
+            except asyncio.CancelledError:
+                logger.warning(f"Provisioning {spec['vm_name']} on {node} cancelled at {current}, cleaning up")
+                await asyncio.shield(clean_up())
+                raise
+            result["seconds"] = loop.time() - started
+            return result
+
+        tasks = [asyncio.ensure_future(provision(spec)) for spec in specs]
+        yielded = set()
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                yielded.add(id(result))
+                yield result
+        finally:
+            # closed early (break, aclose, cancellation): in-flight provisions clean
+            # up after themselves when cancelled; VMs that finished but were never
+            # handed to the caller would be orphans, so remove those too
+            for task in tasks + list(image_tasks.values()):
+                task.cancel()
+            await asyncio.gather(*tasks, *image_tasks.values(), return_exceptions=True)
+            await ready_watcher.aclose()
+            unclaimed = [task.result() for task in tasks if not task.cancelled() and task.exception() is None
+                         and id(task.result()) not in yielded and task.result()["error"] is None]
+            if unclaimed:
+                await asyncio.shield(asyncio.gather(*[
+                    self._cleanup_provision(result, bool(result["spec"].get("iso_prefix")), shared_isos)
+                    for result in unclaimed]))
+            if shared_isos:
+                await asyncio.shield(self._delete_unreferenced_isos(shared_isos))
+
+    async def _cleanup_provision(self, result: dict, shared_iso: bool, shared_isos: set):
+        node, vmid, iso_filename = result["node"], result["vmid"], result["iso_filename"]
+        if iso_filename and shared_iso:
+            shared_isos.add((node, iso_filename))  # deleted per batch if no VM references it any more
+        try:
+            if vmid is not None:
+                if iso_filename and not shared_iso:
+                    await self.eject_and_delete_iso(node, vmid, iso_filename, skip_in_use=False)
+                await self.delete_vm(node, vmid)
+            elif iso_filename and not shared_iso:
+                await self._delete_iso_volid(node, f"{self.storage}:iso/{iso_filename}")
+        except Exception as e:
+            logger.error(f"Cleanup after failed provisioning of {result['vm_name']} failed: {e}")
+
+
+class ClusterSnapshot:
+    """
+    One /cluster/resources fetch, indexed for repeated queries.
+
+    Reconcilers ask many tag-set questions per loop; a snapshot fetches the
+    cluster's VMs once and answers them from a tag -> vmids inverted index
+    (set intersections, smallest set first) and node/status lookups, instead
+    of re-fetching and re-parsing every VM's tags per query.
+
+    Queries return copies of {node, vmid, name, status}, in /cluster/resources
+    order, from the data as of the last refresh — call ensure_fresh() (done
+    by list_vms_by_tags(..., snapshot=...)) or refresh() to update it, and
+    invalidate() after changing VMs or tags yourself.
+
+    :param client: ProxmoxClient used to fetch.
+    :param ttl: Seconds the fetched data is considered fresh (default 30).
+    """
+
+    def __init__(self, client: ProxmoxClient, ttl: float = 30.0):
+        self.client = client
+        self.ttl = ttl
+        self.fetched_at = None  # time.monotonic() of the last refresh
+        self._vms = {}  # vmid -> {node, vmid, name, status}; dict order = /cluster/resources order
+        self._position = {}  # vmid -> index into that order
+        self._by_tag = {}  # lowercased tag -> set of vmids
+        self._by_node = {}  # node -> set of vmids
+        self._by_status = {}  # status -> set of vmids
+        self._refreshing = None
+
+    @property
+    def stale(self) -> bool:
+        return self.fetched_at is None or time.monotonic() - self.fetched_at >= self.ttl
+
+    def invalidate(self):
+        """Mark the data stale so the next ensure_fresh() re-fetches."""
+        self.fetched_at = None
+
+    async def ensure_fresh(self):
+        """Refresh if the data is older than ttl (or was never fetched)."""
+        if self.stale:
+            await self.refresh()
+
+    async def refresh(self):
+        """Re-fetch /cluster/resources and rebuild the indexes. Concurrent
+        callers share one in-flight fetch."""
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._refresh())
+            self._refreshing.add_done_callback(self._refresh_finished)
+        await asyncio.shield(self._refreshing)
+
+    def _refresh_finished(self, task: asyncio.Task):
+        self._refreshing = None
+        if not task.cancelled():
+            task.exception()  # retrieved here so an unjoined failure isn't logged as never retrieved
+
+    async def _refresh(self):
+        resources = await self.client._get("/cluster/resources", type="vm")
+        vms, by_tag, by_node, by_status = {}, {}, {}, {}
+        for r in resources or []:
+            if r.get("type") != "qemu":
+                continue
+            vmid = str(r["vmid"])
+            vm = {"node": r["node"], "vmid": vmid, "name": r.get("name", ""), "status": r.get("status", "unknown")}
+            vms[vmid] = vm
+            # Proxmox accepts both ";" and "," as tag separators, and stores tags lowercased
+            for tag in {t.lower() for t in re.split(r"[;,]", r.get("tags") or "")}:
+                by_tag.setdefault(tag, set()).add(vmid)
+            by_node.setdefault(vm["node"], set()).add(vmid)
+            by_status.setdefault(vm["status"], set()).add(vmid)
+        self._vms, self._by_tag, self._by_node, self._by_status = vms, by_tag, by_node, by_status
+        self._position = {vmid: i for i, vmid in enumerate(vms)}
+        self.fetched_at = time.monotonic()
+        logger.debug(f"Cluster snapshot: {len(vms)} VMs, {len(by_tag)} tags, {len(by_node)} nodes")
+
+    def _select(self, vmids) -> list:
+        return [dict(self._vms[vmid]) for vmid in sorted(vmids, key=self._position.__getitem__)]
+
+    def vms_with_tags(self, required_tags) -> list:
+        """VMs carrying all required_tags (case-insensitive); all VMs if none are given."""
+        required = {t.lower() for t in required_tags}
+        if not required:
+            return self._select(self._vms)
+        sets = sorted((self._by_tag.get(tag, set()) for tag in required), key=len)
+        return self._select(sets[0].intersection(*sets[1:]))
+
+    def vms_on_node(self, node: str) -> list:
+        return self._select(self._by_node.get(node, ()))
+
+    def vms_with_status(self, status: str) -> list:
+        return self._select(self._by_status.get(status, ()))
+
+    def get(self, vmid) -> dict:
+        """The VM with this vmid, or None."""
+        vm = self._vms.get(str(vmid))
+        return dict(vm) if vm is not None else None
+
+    def __len__(self) -> int:
+        return len(self._vms)
@@ -1,5 +1,8 @@
 import os
-import kubernetes
+
+from glueops.lazy_import import lazy_import
+
+kubernetes = lazy_import("kubernetes")
 
 def load_kubernetes_config(logger):
     try:
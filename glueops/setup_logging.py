@@ -1,8 +1,20 @@
-import inspect
-import json
+import atexit
+import collections
+import heapq
+import itertools
 import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import weakref
 from typing import List, Union
 
+from glueops import json_codec
+
 
 class JsonFormatter(logging.Formatter):
     def format(self, record):
@@ -16,13 +28,279 @@ class JsonFormatter(logging.Formatter):
         if record.exc_info:
             log_entry['exception'] = self.formatException(record.exc_info)
 
-        return json.dumps(log_entry)
+        return json_codec.dumps(log_entry)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most `burst` records per key every `window` seconds and
+    drops the rest; the next record let through for that key carries
+    " (suppressed N similar within Ws)".
+
+    A key that goes quiet (the polling loop ended) still gets its count
+    logged: once its window has expired, the next record through this filter
+    (any key) first writes the last suppressed record with the count
+    appended. flush() writes every pending count immediately; it runs when
+    configure() replaces the filter, in shutdown(), and at interpreter exit.
+
+    The key is the record's `log_key` attribute when set (pass
+    extra={"log_key": ...} — e.g. one key per VM in a polling loop, since
+    f-string messages differ on every call), else logger name, level and the
+    unformatted message. Records at exempt_level or above always pass.
+
+    :param max_keys: keys tracked at once; the least recently seen are forgotten.
+    """
+
+    def __init__(self, window: float = 60.0, burst: int = 1, exempt_level: int = logging.ERROR,
+                 max_keys: int = 10000):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.exempt_level = exempt_level
+        self.max_keys = max_keys
+        self._keys = collections.OrderedDict()  # key -> [window start, passed, suppressed, last suppressed record]
+        self._expiring = []  # heap of (window end, sequence, key) for windows with suppressed records
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._clock = time.monotonic
+        _register_rate_limit_filter(self)
+
+    def filter(self, record) -> bool:
+        if getattr(record, "_rate_limit_summary", False) or record.levelno >= self.exempt_level:
+            return True
+        key = getattr(record, "log_key", None)
+        if key is None:
+            key = (record.name, record.levelno, str(record.msg))
+        now = self._clock()
+        with self._lock:
+            state = self._keys.get(key)
+            if state is None:
+                state = self._keys[key] = [now, 0, 0, None]
+                if len(self._keys) > self.max_keys:
+                    self._keys.popitem(last=False)
+            else:
+                self._keys.move_to_end(key)
+            if now - state[0] >= self.window:
+                suppressed = state[2]
+                state[:] = [now, 0, 0, None]
+                if suppressed:
+                    record.msg = f"{record.msg} (suppressed {suppressed} similar within {self.window:g}s)"
+            if state[1] < self.burst:
+                state[1] += 1
+                passed = True
+            else:
+                if not state[2]:
+                    heapq.heappush(self._expiring, (state[0] + self.window, next(self._sequence), key))
+                state[2] += 1
+                state[3] = record
+                passed = False
+            summaries = self._take_expired(now)
+        self._emit(summaries)
+        return passed
+
+    def flush(self):
+        """Write the count of every key with suppressed records now."""
+        with self._lock:
+            summaries = [self._take(state) for state in self._keys.values() if state[2]]
+            self._expiring.clear()
+        self._emit(summaries)
+
+    def _take_expired(self, now: float) -> list:
+        summaries = []
+        while self._expiring and self._expiring[0][0] <= now:
+            window_end, _, key = heapq.heappop(self._expiring)
+            state = self._keys.get(key)
+            # skip keys already reported, reset by a newer window, or forgotten
+            if state is not None and state[2] and state[0] + self.window == window_end:
+                summaries.append(self._take(state))
+        return summaries
+
+    def _take(self, state: list) -> logging.LogRecord:
+        suppressed, last = state[2], state[3]
+        state[2], state[3] = 0, None
+        summary = logging.makeLogRecord(last.__dict__)
+        summary.msg = f"{last.getMessage()} (suppressed {suppressed} similar within {self.window:g}s)"
+        summary.args = None
+        summary._rate_limit_summary = True
+        return summary
+
+    @staticmethod
+    def _emit(summaries: list):
+        for summary in summaries:
+            logging.getLogger(summary.name).callHandlers(summary)
+
+
+_rate_limit_filters = weakref.WeakSet()
+_rate_limit_filters_lock = threading.Lock()
+_rate_limit_atexit_registered = False
+
+
+def _register_rate_limit_filter(log_filter: RateLimitFilter):
+    global _rate_limit_atexit_registered
+    with _rate_limit_filters_lock:
+        _rate_limit_filters.add(log_filter)
+        if not _rate_limit_atexit_registered:
+            atexit.register(_flush_rate_limit_filters)
+            _rate_limit_atexit_registered = True
+
+
+def _flush_rate_limit_filters():
+    with _rate_limit_filters_lock:
+        log_filters = list(_rate_limit_filters)
+    for log_filter in log_filters:
+        log_filter.flush()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets each record through with the probability given for its level
+    (e.g. {logging.DEBUG: 0.05}); levels not listed always pass.
+    """
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = {logging._checkLevel(level): rate for level, rate in rates.items()}
+        self._random = random.Random()
+
+    def filter(self, record) -> bool:
+        rate = self.rates.get(record.levelno)
+        return rate is None or self._random.random() < rate
+
+
+class _BatchWriter(logging.handlers.QueueListener):
+    """Background thread writing already-formatted lines from a bounded queue
+    to a stream, as many as batch_size per write + flush."""
+
+    def __init__(self, queue_size: int, batch_size: int, stream):
+        super().__init__(queue.Queue(queue_size))
+        self.batch_size = batch_size
+        self.stream = stream
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def note_dropped(self):
+        with self._dropped_lock:
+            self._dropped += 1
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)  # block rather than fail when the queue is full
+
+    def _monitor(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = any(line is self._sentinel for line in batch)
+            lines = [line for line in batch if line is not self._sentinel]
+            with self._dropped_lock:
+                dropped, self._dropped = self._dropped, 0
+            if dropped:
+                lines.append(JsonFormatter().format(logging.LogRecord(
+                    __name__, logging.WARNING, __file__, 0,
+                    f"Dropped {dropped} log records: log queue full", None, None)))
+            try:
+                if lines:
+                    self.stream.write("\n".join(lines) + "\n")
+                    self.stream.flush()
+            except Exception:
+                pass  # nowhere left to report a broken log stream; keep draining
+            for _ in batch:
+                self.queue.task_done()
+            if stopping:
+                return
+
+
+_writer = None
+_writer_lock = threading.Lock()
+_atexit_registered = False
+
+
+def _get_writer(queue_size: int, batch_size: int) -> _BatchWriter:
+    global _writer, _atexit_registered
+    with _writer_lock:
+        if _writer is None:
+            _writer = _BatchWriter(queue_size, batch_size, sys.stderr)
+            _writer.start()
+            if not _atexit_registered:
+                atexit.register(shutdown)
+                _atexit_registered = True
+        return _writer
+
+
+def shutdown():
+    """Write out every queued record and stop the background writer used by
+    queued loggers. Runs automatically at interpreter exit; safe to call more
+    than once. Records logged afterwards are written synchronously.
+    Pending RateLimitFilter counts are written first."""
+    global _writer
+    _flush_rate_limit_filters()
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop()
+
+
+class QueuedJsonHandler(logging.handlers.QueueHandler):
+    """
+    Formats each record once, on the logging thread, and hands the line to a
+    background writer shared by every queued logger, so a slow or
+    back-pressured stderr never blocks the caller (e.g. an asyncio event loop).
+
+    :param overflow: what to do when the queue is full: "drop" the record
+        (counted, and reported by the writer as "Dropped N log records") or
+        "block" until there is room.
+    :param queue_size: bound of the shared queue; only the call that starts
+        the writer sets it.
+    :param batch_size: most lines per write; likewise set once.
+    """
+
+    def __init__(self, overflow: str = "drop", queue_size: int = 10000, batch_size: int = 256):
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"overflow must be 'drop' or 'block', not {overflow!r}")
+        super().__init__(_get_writer(queue_size, batch_size).queue)
+        self.overflow = overflow
+
+    def prepare(self, record) -> str:
+        return self.format(record)
+
+    def enqueue(self, line: str):
+        writer = _writer
+        if writer is None:  # after shutdown()
+            sys.stderr.write(line + "\n")
+            return
+        if self.overflow == "block":
+            writer.queue.put(line)
+            return
+        try:
+            writer.queue.put_nowait(line)
+        except queue.Full:
+            writer.note_dropped()
+
+    def flush(self):
+        """Wait until the writer has written everything queued so far."""
+        writer = _writer
+        if writer is not None and writer._thread is not None and writer._thread is not threading.current_thread():
+            writer.queue.join()
+
+
+_configured = {}  # logger name -> (settings, default handler) from the last configure() call
+_configured_lock = threading.Lock()
 
 
 def configure(
     name: str=None,
     level: Union[str, int]=logging.ERROR,
-    handlers: List[logging.Handler]= None
+    handlers: List[logging.Handler]= None,
+    queued: bool=None,
+    overflow: str="drop",
+    queue_size: int=10000,
+    batch_size: int=256,
+    rate_limit: float=None,
+    rate_limit_burst: int=1,
+    sample_rates: dict=None
 ) -> logging.Logger:
     """Configure and return a logger with GlueOps default configuration
 
@@ -31,35 +309,83 @@ def configure(
         level (Union[str, int], optional): The log level, as an int or str. Defaults to logging.ERROR.
             Must be less restrictive than the level applied to additional handlers for those handlers to receive logs
         handlers (List[logging.Handler], optional): List of any additional handlers that may be desired. Defaults to None.
+        queued (bool, optional): Write the JSON logs from a background thread (QueuedJsonHandler) instead of
+            synchronously, so logging never blocks on stderr. Additional handlers stay synchronous.
+            Defaults to the LOG_QUEUED environment variable ("1"/"true"/"yes"), else False.
+        overflow (str, optional): Queued mode only: "drop" or "block" when the queue is full. Defaults to "drop".
+        queue_size (int, optional): Queued mode only: queue bound, set by the first queued logger. Defaults to 10000.
+        batch_size (int, optional): Queued mode only: most lines per write, set by the first queued logger.
+            Defaults to 256.
+        rate_limit (float, optional): Window in seconds for a RateLimitFilter: per key (the record's log_key
+            extra, else its message template) at most rate_limit_burst records pass per window, then
+            "suppressed N similar" is reported. Errors are never limited. Defaults to the LOG_RATE_LIMIT
+            environment variable, else None (off).
+        rate_limit_burst (int, optional): Records per key let through each window. Defaults to 1.
+        sample_rates (dict, optional): Level -> probability of keeping a record (SamplingFilter),
+            e.g. {"DEBUG": 0.1}. Defaults to None (keep everything).
+
+    Calling configure() again for a logger with the same arguments returns it as is; handlers and
+    filters are only rebuilt when something changed.
 
     Returns:
         logging.Logger: Instance of configured logger
     """
     if name is None:
-        frame = inspect.stack()[1]
-        module = inspect.getmodule(frame[0])
-        name = module.__name__ if module else "defaultLogger"
+        name = sys._getframe(1).f_globals.get("__name__", "defaultLogger")
 
     if handlers is None:
         handlers = []
 
+    if queued is None:
+        queued = os.getenv("LOG_QUEUED", "").lower() in ("1", "true", "yes")
+
+    if rate_limit is None and os.getenv("LOG_RATE_LIMIT"):
+        rate_limit = float(os.getenv("LOG_RATE_LIMIT"))
+
+    level = logging._checkLevel(level)
+    settings = (
+        level, tuple(handlers), queued, overflow, queue_size, batch_size, rate_limit, rate_limit_burst,
+        tuple(sorted((logging._checkLevel(lvl), rate) for lvl, rate in sample_rates.items())) if sample_rates else None,
+    )
     logger = logging.getLogger(name)
-    logger.setLevel(level)
 
-    # create default formatter and handler
-    default_handler = logging.StreamHandler()
-    json_formatter = JsonFormatter()
-    default_handler.setFormatter(json_formatter)
+    with _configured_lock:
+        previous = _configured.get(name)
+        if previous is not None and previous[0] == settings and previous[1] in logger.handlers:
+            return logger
+
+        logger.setLevel(level)
+
+        # replace filters added by a previous configure() call
+        for log_filter in logger.filters[:]:
+            if isinstance(log_filter, (RateLimitFilter, SamplingFilter)):
+                logger.removeFilter(log_filter)
+                if isinstance(log_filter, RateLimitFilter):
+                    log_filter.flush()
+        if sample_rates:
+            logger.addFilter(SamplingFilter(sample_rates))
+        if rate_limit:
+            logger.addFilter(RateLimitFilter(window=rate_limit, burst=rate_limit_burst))
+
+        # create default formatter and handler
+        if queued:
+            default_handler = QueuedJsonHandler(overflow=overflow, queue_size=queue_size, batch_size=batch_size)
+        else:
+            default_handler = logging.StreamHandler()
+        json_formatter = JsonFormatter()
+        default_handler.setFormatter(json_formatter)
+
+        # remove handlers not configured by this module
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
 
-    # remove handlers not configured by this module
-    for handler in logger.handlers[:]:
-        logger.removeHandler(handler)
+        # add default handler
+        logger.addHandler(default_handler)
 
-    # add default handler
-    logger.addHandler(default_handler)
+        # add custom handlers
+        for handler in handlers:
+            logger.addHandler(handler)
 
-    # add custom handlers
-    for handler in handlers:
-        logger.addHandler(handler)
+        _configured[name] = (settings, default_handler)
 
     return logger
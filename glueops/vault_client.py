@@ -1,4 +1,18 @@
-import requests
+import asyncio
+import collections
+import concurrent.futures
+import copy
+import os
+import threading
+import time
+
+from glueops import checksum_tools
+from glueops.lazy_import import lazy_import
+
+httpx = lazy_import("httpx")
+requests = lazy_import("requests")
+
+SERVICE_ACCOUNT_TOKEN_PATH = '/var/run/secrets/kubernetes.io/serviceaccount/token'
 
 
 class RedirectError(Exception):
@@ -7,48 +21,190 @@ class RedirectError(Exception):
     """
     pass
 
+
+class CheckAndSetError(Exception):
+    """A write with cas= was rejected because the secret's current version differs:
+    someone else wrote it since it was read."""
+    pass
+
+
+def _check_vault_response(response):
+    """Return the JSON body of a requests or httpx response from vault, or raise."""
+    if response.headers.get('Location'):
+        raise RedirectError(
+            "Received a redirect response when trying to read a secret from Vault. "
+            "Possible reasons: using pomerium, cluster issues, or token expired."
+        )
+    if response.status_code >= 400:
+        raise Exception(f"Error from Secret Store: {response.status_code}")
+    try:
+        response_data = response.json()
+        return response_data
+    except ValueError:
+        raise Exception("Unexpected response format from Secret Store.")
+
+
 def vault_response_handler(vault_api_call):
     def wrapper(*args, **kwargs):
-        response = vault_api_call(*args, **kwargs)
-        if response.headers.get('Location'):
-            raise RedirectError(
-                "Received a redirect response when trying to read a secret from Vault. "
-                "Possible reasons: using pomerium, cluster issues, or token expired."
-            )
-        if not response.ok:
-            raise Exception(f"Error from Secret Store: {response.status_code}")
-        try:
-            response_data = response.json()
-            return response_data
-        except ValueError:
-            raise Exception("Unexpected response format from Secret Store.")
+        return _check_vault_response(vault_api_call(*args, **kwargs))
     return wrapper
 
 
-class VaultClient:
+class _VaultClientBase:
+    """Token, path and response handling shared by VaultClient and AsyncVaultClient."""
+
+    def __init__(self, vault_url, kubernetes_role, vault_token, pomerium_cookie, timeout, renew_before):
+        self.vault_url = vault_url
+        self.kubernetes_role = kubernetes_role
+        self.vault_token = vault_token
+        self.pomerium_cookie = pomerium_cookie
+        self.timeout = timeout
+        self.renew_before = renew_before
+        self.headers = {}
+        self._token_expires_at = None  # monotonic deadline of a kube-auth token; None when unknown
+        self._token_renewable = False
+        self._jwt = None  # (mtime, token) of the service account token file
+        self._digests = {}  # adjusted path -> digest of the data last written or compared by write_if_changed
+
+    def _get_jwt_token(self) -> str:
+        # projected service account tokens are rotated in place; re-read only when the file changes
+        mtime = os.stat(SERVICE_ACCOUNT_TOKEN_PATH).st_mtime_ns
+        if self._jwt is None or self._jwt[0] != mtime:
+            with open(SERVICE_ACCOUNT_TOKEN_PATH, 'r') as f:
+                self._jwt = (mtime, f.read().strip())
+        return self._jwt[1]
+
+    def _set_token_lease(self, auth: dict):
+        lease_duration = auth.get("lease_duration") or 0
+        self._token_expires_at = time.monotonic() + lease_duration if lease_duration > 0 else None
+        self._token_renewable = bool(auth.get("renewable"))
+
+    def _renewed_long_enough(self) -> bool:
+        return self._token_expires_at is None or self._token_expires_at - time.monotonic() > self.renew_before
+
+    def _adjust_path(self, path: str) -> str:
+        if path.startswith("secret/") and not path.startswith("secret/data/"):
+            return path.replace("secret/", "secret/data/")
+        return path
+
+    @staticmethod
+    def _metadata_path(path: str) -> str:
+        mount, sep, rest = path.partition("/data/")
+        return f"{mount}/metadata/{rest}" if sep else None
+
+    def _token_is_current(self) -> bool:
+        return bool(self.vault_token) and self.headers.get('X-Vault-Token') == self.vault_token and (
+            self._token_expires_at is None or time.monotonic() < self._token_expires_at - self.renew_before
+        )
+
+    def _set_token(self, token: str):
+        self.vault_token = token
+        headers = {
+            'X-Vault-Token': token
+        }
+        if self.pomerium_cookie:
+            headers["cookie"] = f"_pomerium={self.pomerium_cookie}"
+        self.headers = headers
+
+    @staticmethod
+    def _write_body(data: dict, cas: int = None) -> dict:
+        body = {"data": data}
+        if cas is not None:
+            body["options"] = {"cas": cas}
+        return body
+
+    @staticmethod
+    def _check_cas(response, secret_path: str, cas: int = None):
+        if cas is not None and response.status_code == 400 and "check-and-set" in response.text:
+            raise CheckAndSetError(f"{secret_path} is no longer at version {cas}")
+
+    @staticmethod
+    def _current_from_response(response):
+        """(data, version) of a current-version read: (None, 0) if the secret
+        was never written, (None, version) if deleted."""
+        if response.status_code == 404:
+            try:
+                metadata = (response.json().get("data") or {}).get("metadata") or {}
+            except ValueError:
+                metadata = {}
+            return None, metadata.get("version") or 0
+        response_data = _check_vault_response(response)
+        return (response_data.get("data") or {}).get("data"), \
+            ((response_data.get("data") or {}).get("metadata") or {}).get("version")
+
+    @staticmethod
+    def _secret_from_response(response_data: dict):
+        """Return (data, version) from a secret read; version is None outside KV v2."""
+        if 'data' not in response_data:
+            raise Exception("Missing data.")
+
+        actual_data = response_data['data'].get('data')
+        if not actual_data:
+            raise Exception("Failed to get secret from secret store")
+
+        version = (response_data['data'].get('metadata') or {}).get('version')
+        return actual_data, version
+
+
+class VaultClient(_VaultClientBase):
     def __init__(
         self,
         vault_url: str,
         kubernetes_role: str,
         vault_token: str = None,
-        pomerium_cookie: str = None
+        pomerium_cookie: str = None,
+        pool_maxsize: int = 10,
+        timeout: float = 30.0,
+        renew_before: float = 300.0,
+        cache_ttl: float = None,
+        cache_size: int = 1024,
+        cache_revalidate: bool = False
     ) -> None:
         """
         Initialize a VaultClient for reading and writing secrets to vault.
 
+        Requests go through one requests.Session, so reads reuse kept-alive
+        connections. A token obtained through Kubernetes auth is renewed
+        (renew-self) renew_before seconds ahead of its expiry, or replaced by a
+        fresh login once it can no longer be renewed.
+
         :param vault_url: The url of the target vault cluster
         :param kubernetes_role: The kubernetes_role to use when generating an client toke to access vault.
         :param vault_token: The vault token to use for accessing vault and can be generated in this class.
         :param pomerium_cookie: Pomerium's cookie to use to access vault.  Retrieved from a browser session that has been authenticated to vault.
+        :param pool_maxsize: Connections kept open to vault; raise it when reading from many threads.
+        :param timeout: Seconds to wait for vault to connect or respond.
+        :param renew_before: Seconds before token expiry at which to renew it.
+        :param cache_ttl: Cache get_data_from_vault results for this many seconds (default: no cache).
+            Writes through this client drop the cached entry for their path.
+        :param cache_size: Most secrets cached; the least recently read are evicted.
+        :param cache_revalidate: When a cached KV v2 secret expires, ask the metadata endpoint for its
+            current_version and only fetch the secret again if it changed.
         """
-        self.vault_url = vault_url
-        self.kubernetes_role = kubernetes_role
-        self.vault_token = vault_token
-        self.pomerium_cookie = pomerium_cookie
+        super().__init__(vault_url, kubernetes_role, vault_token, pomerium_cookie, timeout, renew_before)
+        self.pool_maxsize = pool_maxsize
+        self.session = requests.Session()
+        self.session.verify = False
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._token_lock = threading.Lock()
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.cache_revalidate = cache_revalidate
+        self._cache = collections.OrderedDict()  # adjusted path -> [expires_at, version, data]
+        self._cache_lock = threading.Lock()
+        self._cache_stats = {"hits": 0, "misses": 0, "revalidated": 0}
 
-    def _get_jwt_token(self) -> str:
-        with open('/var/run/secrets/kubernetes.io/serviceaccount/token', 'r') as f:
-            return f.read().strip()
+    def close(self):
+        """Close the pooled connections."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     def _get_vault_token_via_kube_auth(self) -> str:
         jwt_token = self._get_jwt_token()
@@ -56,79 +212,478 @@ class VaultClient:
             "jwt": jwt_token,
             "role": self.kubernetes_role
         }
-        response = requests.post(
+        response = self.session.post(
             f"{self.vault_url}/v1/auth/kubernetes/login",
             json=payload,
-            verify=False
+            timeout=self.timeout
         )
         response.raise_for_status()
 
-        return response.json()["auth"]["client_token"]
+        auth = response.json()["auth"]
+        self._set_token_lease(auth)
+        return auth["client_token"]
 
-    def _adjust_path(self, path: str) -> str:
-        if path.startswith("secret/") and not path.startswith("secret/data/"):
-            return path.replace("secret/", "secret/data/")
-        return path
+    def _renew_token(self) -> bool:
+        """Extend the current token's lease; False if vault refused or the
+        token's max TTL no longer leaves renew_before seconds."""
+        try:
+            response = self.session.post(
+                f"{self.vault_url}/v1/auth/token/renew-self",
+                headers=self.headers,
+                json={},
+                allow_redirects=False,
+                timeout=self.timeout
+            )
+        except requests.exceptions.RequestException:
+            return False
+        if not response.ok:
+            return False
+        auth = response.json().get("auth") or {}
+        self._set_token_lease(auth)
+        return self._renewed_long_enough()
 
     def _vault_auth(self):
-        if not self.vault_token:
-            self.vault_token = self._get_vault_token_via_kube_auth()
-        self.headers = {
-            'X-Vault-Token': self.vault_token
-        }
-        if self.pomerium_cookie:
-            self.headers["cookie"] = f"_pomerium={self.pomerium_cookie}"
+        if self._token_is_current():
+            return
+        with self._token_lock:
+            if self._token_is_current():
+                return
+            if not self.vault_token:
+                self._set_token(self._get_vault_token_via_kube_auth())
+            elif self.headers.get('X-Vault-Token') != self.vault_token:
+                # passed to __init__ or assigned by the caller; its lifetime is theirs to manage
+                self._token_expires_at = None
+                self._set_token(self.vault_token)
+            elif not (self._token_renewable and self._renew_token()):
+                self._set_token(self._get_vault_token_via_kube_auth())
 
     @vault_response_handler
-    def _query_vault(
+    def _vault_get(
         self,
-        secret_path: str
+        path: str
     ):
         self._vault_auth()
 
-        secret_path = self._adjust_path(secret_path)
-
-        return requests.get(
-            f"{self.vault_url}/v1/{secret_path}",
+        return self.session.get(
+            f"{self.vault_url}/v1/{path}",
             headers=self.headers,
-            verify=False,
-            allow_redirects=False
+            allow_redirects=False,
+            timeout=self.timeout
         )
 
+    def _query_vault(
+        self,
+        secret_path: str
+    ):
+        return self._vault_get(self._adjust_path(secret_path))
+
+    def _read_secret(self, path: str):
+        """Return (data, version) for an adjusted path; version is None outside KV v2."""
+        return self._secret_from_response(self._vault_get(path))
+
     def get_data_from_vault(
         self,
         secret_path: str
     ):
+        if not self.cache_ttl:
+            return self._read_secret(self._adjust_path(secret_path))[0]
+
+        path = self._adjust_path(secret_path)
+        with self._cache_lock:
+            entry = self._cache.get(path)
+            if entry is not None:
+                self._cache.move_to_end(path)
+                if time.monotonic() < entry[0]:
+                    self._cache_stats["hits"] += 1
+                    return copy.deepcopy(entry[2])
+
+        if entry is not None and self.cache_revalidate and entry[1] is not None and self._metadata_path(path):
+            try:
+                metadata = self._vault_get(self._metadata_path(path))
+            except Exception:
+                metadata = {}  # e.g. no read access to metadata/; fall back to fetching the secret
+            if (metadata.get('data') or {}).get('current_version') == entry[1]:
+                with self._cache_lock:
+                    entry[0] = time.monotonic() + self.cache_ttl
+                    self._cache_stats["hits"] += 1
+                    self._cache_stats["revalidated"] += 1
+                return copy.deepcopy(entry[2])
+
+        data, version = self._read_secret(path)
+        with self._cache_lock:
+            self._cache_stats["misses"] += 1
+            self._cache[path] = [time.monotonic() + self.cache_ttl, version, copy.deepcopy(data)]
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return data
+
+    def invalidate(self, secret_path: str = None):
+        """Drop the cached copy of one secret, or of every secret."""
+        with self._cache_lock:
+            if secret_path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(self._adjust_path(secret_path), None)
+
+    def cache_stats(self) -> dict:
+        """Return {"hits", "misses", "revalidated", "size"} of the secret cache;
+        revalidated hits are also counted in hits."""
+        with self._cache_lock:
+            return dict(self._cache_stats, size=len(self._cache))
+
+    def get_many(
+        self,
+        secret_paths: list,
+        max_workers: int = None
+    ):
+        """
+        Read several secrets in parallel over the pooled connections.
+
+        :param secret_paths: Paths as accepted by get_data_from_vault.
+        :param max_workers: Reads in flight at once (default: pool_maxsize).
+        :return: (results, errors): {path: data} for the reads that worked and
+            {path: exception} for those that failed, keyed by the paths given.
+        """
+        results, errors = {}, {}
+        paths = list(dict.fromkeys(secret_paths))
+        if not paths:
+            return results, errors
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers or self.pool_maxsize, len(paths))) as pool:
+            futures = {pool.submit(self.get_data_from_vault, path): path for path in paths}
+            for future in concurrent.futures.as_completed(futures):
+                path = futures[future]
+                try:
+                    results[path] = future.result()
+                except Exception as e:
+                    errors[path] = e
+        return results, errors
+
+    def _list_keys(
+        self,
+        metadata_path: str
+    ) -> list:
         self._vault_auth()
-        response_data = self._query_vault(
-            secret_path=secret_path
+        response = self.session.request(
+            "LIST",
+            f"{self.vault_url}/v1/{metadata_path}",
+            headers=self.headers,
+            allow_redirects=False,
+            timeout=self.timeout
         )
-        if 'data' not in response_data:
-            raise Exception("Missing data.")
+        if response.status_code == 404:
+            return []  # nothing stored under this path
+        return _check_vault_response(response)['data']['keys']
 
-        actual_data = response_data['data'].get('data')
-        if not actual_data:
-            raise Exception("Failed to get secret from secret store")
+    def read_tree(
+        self,
+        prefix: str,
+        max_workers: int = None
+    ):
+        """
+        Read every KV v2 secret under a prefix, e.g. "secret/tenant-a".
+
+        Folders are listed through the metadata endpoint level by level and
+        the secrets read with get_many, both max_workers at a time.
+
+        :param prefix: Folder to read, as accepted by get_data_from_vault.
+        :param max_workers: Requests in flight at once (default: pool_maxsize).
+        :return: (results, errors) as get_many, keyed "<prefix>/<relative path>";
+            a folder that could not be listed is reported under its own path.
+        """
+        prefix = prefix.rstrip("/")
+        metadata_root = self._metadata_path(self._adjust_path(prefix + "/"))
+        if metadata_root is None:
+            raise ValueError(f"{prefix!r} is not a KV v2 path (expected e.g. secret/<folder>)")
 
-        return actual_data
+        secret_paths, errors = [], {}
+        folders = [""]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers or self.pool_maxsize) as pool:
+            while folders:
+                futures = {pool.submit(self._list_keys, metadata_root + folder): folder for folder in folders}
+                folders = []
+                for future in concurrent.futures.as_completed(futures):
+                    folder = futures[future]
+                    try:
+                        keys = future.result()
+                    except Exception as e:
+                        errors[f"{prefix}/{folder}"] = e
+                        continue
+                    for key in keys:
+                        if key.endswith("/"):
+                            folders.append(folder + key)
+                        else:
+                            secret_paths.append(f"{prefix}/{folder}{key}")
 
+        results, read_errors = self.get_many(sorted(secret_paths), max_workers=max_workers)
+        errors.update(read_errors)
+        return results, errors
 
     @vault_response_handler
     def write_data_to_vault(
         self,
         secret_path: str,
-        data: dict
+        data: dict,
+        cas: int = None
     ):
+        """
+        Write a secret.
+
+        :param cas: KV v2 check-and-set: only write if the secret's current
+            version is cas (0: only if it does not exist yet); raises
+            CheckAndSetError otherwise.
+        """
         self._vault_auth()
 
         secret_path = self._adjust_path(secret_path)
 
         write_vault_path=f"{self.vault_url}/v1/{secret_path}"
-        response = requests.post(
+        response = self.session.post(
             write_vault_path,
             headers=self.headers,
-            verify=False,
             allow_redirects=False,
-            json={"data":data}
+            json=self._write_body(data, cas),
+            timeout=self.timeout
         )
+        self.invalidate(secret_path)
+        self._digests.pop(secret_path, None)
+        self._check_cas(response, secret_path, cas)
         return response
+
+    def _read_current(self, path: str):
+        """Return (data, version) of a secret's current version, bypassing the
+        cache; (None, 0) if it was never written, (None, version) if deleted."""
+        self._vault_auth()
+        response = self.session.get(
+            f"{self.vault_url}/v1/{path}",
+            headers=self.headers,
+            allow_redirects=False,
+            timeout=self.timeout
+        )
+        return self._current_from_response(response)
+
+    def write_if_changed(
+        self,
+        secret_path: str,
+        data: dict,
+        cas: bool = False,
+        trust_local_digest: bool = False
+    ) -> bool:
+        """
+        Write a secret only if its data differs from what vault holds, so
+        unchanged secrets don't gain a new KV v2 version on every sync.
+
+        Data is compared by a canonical digest (checksum_tools.compute_sha224_json),
+        so key order does not matter.
+
+        :param cas: Write with check-and-set against the version just read, so a
+            concurrent writer is never overwritten; raises CheckAndSetError if one
+            got in first.
+        :param trust_local_digest: Skip the read when this client last wrote or
+            saw the same data at this path. Only safe when nothing else writes it.
+        :return: True if a write happened, False if the data was unchanged.
+        """
+        path = self._adjust_path(secret_path)
+        digest = checksum_tools.compute_sha224_json(data)
+        if trust_local_digest and self._digests.get(path) == digest:
+            return False
+
+        current, version = self._read_current(path)
+        if current is not None and checksum_tools.compute_sha224_json(current) == digest:
+            self._digests[path] = digest
+            return False
+
+        self.write_data_to_vault(path, data, cas=(version or 0) if cas else None)
+        self._digests[path] = digest
+        return True
+
+
+class AsyncVaultClient(_VaultClientBase):
+    def __init__(
+        self,
+        vault_url: str,
+        kubernetes_role: str,
+        vault_token: str = None,
+        pomerium_cookie: str = None,
+        limits=None,
+        timeout: float = 30.0,
+        renew_before: float = 300.0,
+        transport=None
+    ) -> None:
+        """
+        Initialize an asyncio client for reading and writing secrets to vault,
+        with the same paths, authentication and errors as VaultClient.
+
+        All requests share one httpx.AsyncClient, so secret reads reuse
+        connections and can run alongside ProxmoxClient/WaggleClient calls.
+        Call aclose() (or use `async with`) when done. As with VaultClient,
+        the Kubernetes login follows redirects (e.g. from a standby node) while
+        reads and writes raise RedirectError on one. Writes support cas= and
+        write_if_changed; unlike VaultClient there is no secret cache and no
+        read_tree.
+
+        :param vault_url: The url of the target vault cluster
+        :param kubernetes_role: The kubernetes_role to use when generating an client toke to access vault.
+        :param vault_token: The vault token to use for accessing vault and can be generated in this class.
+        :param pomerium_cookie: Pomerium's cookie to use to access vault.  Retrieved from a browser session that has been authenticated to vault.
+        :param limits: httpx.Limits for the connection pool (default: httpx's defaults).
+        :param timeout: Seconds to wait for vault to connect or respond.
+        :param renew_before: Seconds before token expiry at which to renew it.
+        :param transport: httpx transport used instead of the network (e.g.
+            httpx.MockTransport in tests); limits then does not apply.
+        """
+        super().__init__(vault_url, kubernetes_role, vault_token, pomerium_cookie, timeout, renew_before)
+        self.limits = limits
+        self._transport = transport
+        self._http = None
+        self._token_lock = asyncio.Lock()
+
+    def _client(self) -> "httpx.AsyncClient":
+        if self._http is None or self._http.is_closed:
+            options = {}
+            if self._transport is not None:
+                options["transport"] = self._transport
+            elif self.limits is not None:
+                options["limits"] = self.limits
+            self._http = httpx.AsyncClient(base_url=self.vault_url, verify=False, timeout=self.timeout,
+                                           follow_redirects=True, **options)
+        return self._http
+
+    async def aclose(self):
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def _get_vault_token_via_kube_auth(self) -> str:
+        payload = {
+            "jwt": self._get_jwt_token(),
+            "role": self.kubernetes_role
+        }
+        response = await self._client().post("/v1/auth/kubernetes/login", json=payload)
+        response.raise_for_status()
+
+        auth = response.json()["auth"]
+        self._set_token_lease(auth)
+        return auth["client_token"]
+
+    async def _renew_token(self) -> bool:
+        try:
+            response = await self._client().post("/v1/auth/token/renew-self", headers=self.headers, json={},
+                                                 follow_redirects=False)
+        except httpx.HTTPError:
+            return False
+        if response.status_code >= 400:
+            return False
+        self._set_token_lease(response.json().get("auth") or {})
+        return self._renewed_long_enough()
+
+    async def _vault_auth(self):
+        if self._token_is_current():
+            return
+        async with self._token_lock:
+            if self._token_is_current():
+                return
+            if not self.vault_token:
+                self._set_token(await self._get_vault_token_via_kube_auth())
+            elif self.headers.get('X-Vault-Token') != self.vault_token:
+                self._token_expires_at = None
+                self._set_token(self.vault_token)
+            elif not (self._token_renewable and await self._renew_token()):
+                self._set_token(await self._get_vault_token_via_kube_auth())
+
+    async def _vault_get(self, path: str):
+        await self._vault_auth()
+        return _check_vault_response(await self._client().get(f"/v1/{path}", headers=self.headers,
+                                                               follow_redirects=False))
+
+    async def get_data_from_vault(
+        self,
+        secret_path: str
+    ):
+        return self._secret_from_response(await self._vault_get(self._adjust_path(secret_path)))[0]
+
+    async def get_many(
+        self,
+        secret_paths: list,
+        max_concurrency: int = 10
+    ):
+        """
+        Read several secrets concurrently.
+
+        :param secret_paths: Paths as accepted by get_data_from_vault.
+        :param max_concurrency: Reads in flight at once.
+        :return: (results, errors) as VaultClient.get_many.
+        """
+        paths = list(dict.fromkeys(secret_paths))
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def read(path):
+            async with semaphore:
+                return await self.get_data_from_vault(path)
+
+        outcomes = await asyncio.gather(*[read(path) for path in paths], return_exceptions=True)
+        results, errors = {}, {}
+        for path, outcome in zip(paths, outcomes):
+            if isinstance(outcome, Exception):
+                errors[path] = outcome
+            else:
+                results[path] = outcome
+        return results, errors
+
+    async def write_data_to_vault(
+        self,
+        secret_path: str,
+        data: dict,
+        cas: int = None
+    ):
+        """
+        Write a secret.
+
+        :param cas: KV v2 check-and-set, as VaultClient.write_data_to_vault.
+        """
+        await self._vault_auth()
+        secret_path = self._adjust_path(secret_path)
+        response = await self._client().post(
+            f"/v1/{secret_path}",
+            headers=self.headers,
+            json=self._write_body(data, cas),
+            follow_redirects=False
+        )
+        self._digests.pop(secret_path, None)
+        self._check_cas(response, secret_path, cas)
+        return _check_vault_response(response)
+
+    async def _read_current(self, path: str):
+        await self._vault_auth()
+        response = await self._client().get(f"/v1/{path}", headers=self.headers, follow_redirects=False)
+        return self._current_from_response(response)
+
+    async def write_if_changed(
+        self,
+        secret_path: str,
+        data: dict,
+        cas: bool = False,
+        trust_local_digest: bool = False
+    ) -> bool:
+        """
+        Write a secret only if its data differs from what vault holds; same
+        arguments and result as VaultClient.write_if_changed.
+        """
+        path = self._adjust_path(secret_path)
+        digest = checksum_tools.compute_sha224_json(data)
+        if trust_local_digest and self._digests.get(path) == digest:
+            return False
+
+        current, version = await self._read_current(path)
+        if current is not None and checksum_tools.compute_sha224_json(current) == digest:
+            self._digests[path] = digest
+            return False
+
+        await self.write_data_to_vault(path, data, cas=(version or 0) if cas else None)
+        self._digests[path] = digest
+        return True
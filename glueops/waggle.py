@@ -17,9 +17,10 @@ Usage:
 
 import os
 
-import httpx
+from glueops import json_codec, setup_logging
+from glueops.lazy_import import lazy_import
 
-from glueops import setup_logging
+httpx = lazy_import("httpx")
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 logger = setup_logging.configure(level=LOG_LEVEL)
@@ -31,27 +32,34 @@ class WaggleClient:
 
     :param api_url: Base URL of the Waggle server; "/api/v1" is appended if missing.
     :param api_key: Organization API key ("wgl_..." prefix).
+    :param metrics: glueops.http_metrics.HttpMetrics to record per-endpoint
+        latency, status codes and bytes into (service "waggle"); off by default.
     """
 
-    def __init__(self, api_url, api_key):
+    def __init__(self, api_url, api_key, metrics=None):
         base = api_url.rstrip("/")
         if not base.endswith("/api/v1"):
             base += "/api/v1"
         self.api_url = base
         self._api_key = api_key
+        self.metrics = metrics
         self._http = None
 
-    def _client(self) -> httpx.AsyncClient:
+    def _client(self) -> "httpx.AsyncClient":
         if self._http is None or self._http.is_closed:
+            options = {}
+            if self.metrics is not None:
+                options["event_hooks"] = self.metrics.event_hooks("waggle")
             self._http = httpx.AsyncClient(
                 base_url=self.api_url,
                 headers={"Authorization": f"Bearer {self._api_key}"},
                 timeout=30.0,
+                **options,
             )
         return self._http
 
     @staticmethod
-    def _check(response: httpx.Response):
+    def _check(response: "httpx.Response"):
         if response.status_code >= 400:
             raise RuntimeError(
                 f"Waggle API {response.request.method} {response.request.url.path} "
@@ -61,17 +69,17 @@ class WaggleClient:
     async def _get(self, path, **params):
         r = await self._client().get(path, params=params or None)
         self._check(r)
-        return r.json()
+        return json_codec.loads(r.content)
 
     async def _post(self, path, body: dict):
         r = await self._client().post(path, json=body)
         self._check(r)
-        return r.json()
+        return json_codec.loads(r.content)
 
     async def _patch(self, path, body: dict):
         r = await self._client().patch(path, json=body)
         self._check(r)
-        return r.json() if r.content else None
+        return json_codec.loads(r.content) if r.content else None
 
     async def _delete(self, path):
         r = await self._client().delete(path)
@@ -0,0 +1,487 @@
+"""In-process Proxmox VE API simulator for ProxmoxClient.
+
+Serves the REST surface ProxmoxClient uses — nodes, storage content (import
+and iso volumes, uploads, download-url), qemu VMs with pending changes and
+snapshots, UPID tasks that finish after configurable durations, the cluster
+resource/status/nextid endpoints, and a guest agent that comes up and
+finishes cloud-init after configurable boot delays — through an
+httpx.MockTransport, with optional per-request latency. Every request is
+counted per method and path template, so callers can assert request volume.
+
+Test and benchmark support only; it is not part of the installed package.
+Tests import it as `proxmox_sim` (pytest puts tests/ on sys.path);
+benchmarks/proxmox_bench.py adds tests/ to sys.path itself.
+
+Usage:
+    from glueops.proxmox import ProxmoxClient
+    from proxmox_sim import FakeProxmox
+
+    sim = FakeProxmox(nodes=["pve1", "pve2"], latency=0.002)
+    sim.add_vms(100, tags=["my-app"])
+    client = ProxmoxClient("sim", "automation@pve!bench", "secret", storage="local",
+                           transport=sim.transport())
+    await client.list_vms_by_tags(["my-app"])
+    print(sim.request_count())
+"""
+
+import asyncio
+import collections
+import itertools
+import json
+import re
+import time
+import urllib.parse
+
+import httpx
+
+from glueops.http_metrics import normalize_path
+
+_ROUTES = []
+
+
+def _route(method: str, pattern: str):
+    def register(handler):
+        _ROUTES.append((method, re.compile(f"^{pattern}$"), handler))
+        return handler
+    return register
+
+
+class SimError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class FakeProxmox:
+    """
+    A simulated Proxmox VE cluster.
+
+    :param nodes: node names (all online).
+    :param storage: storage id served (the client's `storage`).
+    :param shared_storage: report the storage as shared (one volume set for
+        every node) instead of node-local.
+    :param latency: seconds added to every request.
+    :param task_durations: seconds per task type ("qmcreate", "qmstart",
+        "qmstop", "qmdestroy", "download", "imgcopy", "imgdel", "resize"),
+        merged over TASK_DURATIONS.
+    :param agent_delay: seconds after start until the guest agent answers.
+    :param cloudinit_delay: seconds after start until cloud-init has finished.
+    :param exec_delay: seconds an agent exec takes to exit.
+    :param running_task_status: status listed by /nodes/{node}/tasks for tasks
+        still running (default None: the field is left out).
+    """
+
+    TASK_DURATIONS = {
+        "qmcreate": 0.05,
+        "qmstart": 0.02,
+        "qmstop": 0.02,
+        "qmdestroy": 0.03,
+        "download": 0.2,
+        "imgcopy": 0.01,
+        "imgdel": 0.0,
+        "resize": 0.01,
+    }
+
+    def __init__(self, nodes=("pve1",), storage: str = "local", shared_storage: bool = False,
+                 latency: float = 0.0, task_durations: dict = None, agent_delay: float = 0.05,
+                 cloudinit_delay: float = 0.1, exec_delay: float = 0.01, running_task_status: str = None):
+        self.storage = storage
+        self.shared_storage = shared_storage
+        self.latency = latency
+        self.task_durations = {**self.TASK_DURATIONS, **(task_durations or {})}
+        self.agent_delay = agent_delay
+        self.cloudinit_delay = cloudinit_delay
+        self.exec_delay = exec_delay
+        self.running_task_status = running_task_status
+        self.nodes = {name: {"status": "online"} for name in nodes}
+        self.volumes = {name: {} for name in nodes}  # node -> {volid: {"volid", "content", "size"}}
+        if shared_storage:
+            shared = {}
+            self.volumes = {name: shared for name in nodes}
+        self.vms = {}  # vmid (int) -> vm dict
+        self.tasks = {}  # upid -> task dict
+        self.requests = collections.Counter()  # (method, path template) -> count
+        self._pids = itertools.count(1)
+        self._exec_pids = itertools.count(1)
+
+    # --- Setup ----------------------------------------------------------------
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self._handle)
+
+    def add_volume(self, node: str, volid: str, size: int = 0):
+        content = volid.split(":", 1)[1].split("/", 1)[0]
+        self.volumes[node][volid] = {"volid": volid, "content": content, "size": size}
+
+    def add_vm(self, node: str, vmid: int, name: str = None, tags=(), status: str = "stopped",
+               config: dict = None, pending: dict = None, snapshots: dict = None) -> dict:
+        """Add a VM directly (no task). snapshots maps name -> config dict;
+        pending maps config key -> pending value."""
+        vm = {
+            "vmid": int(vmid), "node": node, "name": name or f"vm{vmid}", "status": status,
+            "config": {"name": name or f"vm{vmid}", **(config or {})},
+            "pending": dict(pending or {}), "snapshots": dict(snapshots or {}),
+            "started_at": None, "ip": f"10.{int(vmid) // 65536 % 256}.{int(vmid) // 256 % 256}.{int(vmid) % 256}",
+        }
+        if tags:
+            vm["config"]["tags"] = ";".join(tags)
+        if status == "running":
+            vm["started_at"] = time.monotonic() - max(self.agent_delay, self.cloudinit_delay)
+        self.vms[int(vmid)] = vm
+        return vm
+
+    def add_vms(self, count: int, tags=(), first_vmid: int = 100, snapshots_per_vm: int = 0,
+                iso_per_vm: bool = True, status: str = "running"):
+        """Add `count` VMs spread round-robin over the nodes, each (optionally)
+        with an attached cloud-init ISO volume and `snapshots_per_vm` snapshots."""
+        node_names = list(self.nodes)
+        for i in range(count):
+            vmid = first_vmid + i
+            node = node_names[i % len(node_names)]
+            config = {}
+            if iso_per_vm:
+                volid = f"{self.storage}:iso/vm{vmid}-cloudinit.iso"
+                self.add_volume(node, volid, size=55296)
+                config["ide2"] = f"{volid},media=cdrom"
+            snapshots = {f"snap{j}": dict(config) for j in range(snapshots_per_vm)}
+            self.add_vm(node, vmid, tags=tags, status=status, config=config, snapshots=snapshots)
+
+    def add_task(self, node: str, task_type: str = "qmstart", task_id: str = "", duration: float = None,
+                 exitstatus: str = "OK") -> str:
+        """Start a task directly; it finishes after `duration` seconds (default:
+        task_durations[task_type]) with `exitstatus`. Returns its UPID."""
+        return self._task(node, task_type, task_id, fail=None if exitstatus == "OK" else exitstatus,
+                          duration=duration)
+
+    def request_count(self, method: str = None, template: str = None) -> int:
+        return sum(n for (m, t), n in self.requests.items()
+                   if (method is None or m == method) and (template is None or t == template))
+
+    def reset_counts(self):
+        self.requests.clear()
+
+    # --- Dispatch -------------------------------------------------------------
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        # match on the raw path so volids and UPIDs stay one segment
+        path = request.url.raw_path.decode("ascii").split("?", 1)[0]
+        if path.startswith("/api2/json"):
+            path = path[len("/api2/json"):]
+        self.requests[(request.method, normalize_path(path))] += 1
+        params = dict(request.url.params)
+        body = await request.aread()
+        form = {}
+        content_type = request.headers.get("content-type", "")
+        if content_type.startswith("application/x-www-form-urlencoded"):
+            form = dict(urllib.parse.parse_qsl(body.decode()))
+        elif content_type.startswith("application/json"):
+            form = json.loads(body or b"{}")
+        elif content_type.startswith("multipart/form-data"):
+            form = {"_multipart": body}
+        for method, pattern, handler in _ROUTES:
+            if method != request.method:
+                continue
+            match = pattern.match(path)
+            if match:
+                try:
+                    data = handler(self, *[urllib.parse.unquote(g) for g in match.groups()], params=params, form=form)
+                except SimError as e:
+                    return httpx.Response(e.status, json={"data": None, "message": e.message})
+                return httpx.Response(200, json={"data": data})
+        return httpx.Response(501, json={"data": None, "message": f"Method '{request.method} {path}' not implemented"})
+
+    # --- Helpers --------------------------------------------------------------
+
+    def _node(self, node: str):
+        if node not in self.nodes:
+            raise SimError(595, f"no such cluster node '{node}'")
+        if self.nodes[node]["status"] != "online":
+            raise SimError(595, f"Connection refused to node '{node}'")
+
+    def _vm(self, node: str, vmid: str) -> dict:
+        self._node(node)
+        vm = self.vms.get(int(vmid))
+        if vm is None or vm["node"] != node:
+            raise SimError(500, f"Configuration file 'nodes/{node}/qemu-server/{vmid}.conf' does not exist")
+        return vm
+
+    def _task(self, node: str, task_type: str, task_id: str = "", on_done=None, fail: str = None,
+              duration: float = None) -> str:
+        pid = next(self._pids)
+        upid = f"UPID:{node}:{pid:08X}:00000000:{int(time.time()):08X}:{task_type}:{task_id}:root@pam:"
+        if duration is None:
+            duration = self.task_durations.get(task_type, 0.0)
+        self.tasks[upid] = {
+            "upid": upid, "node": node, "type": task_type, "id": task_id,
+            "starttime": int(time.time()), "ends_at": time.monotonic() + duration,
+            "on_done": on_done, "exitstatus": fail or "OK", "done": False,
+        }
+        return upid
+
+    def _settle(self, task: dict) -> bool:
+        """Finish a task whose duration has elapsed; return True if stopped."""
+        if not task["done"] and time.monotonic() >= task["ends_at"]:
+            task["done"] = True
+            if task["on_done"] is not None and task["exitstatus"] == "OK":
+                task["on_done"]()
+        return task["done"]
+
+    def _agent_up(self, vm: dict) -> bool:
+        return vm["status"] == "running" and vm["started_at"] is not None and \
+            time.monotonic() - vm["started_at"] >= self.agent_delay
+
+    def _require_agent(self, vm: dict):
+        if not self._agent_up(vm):
+            raise SimError(500, "QEMU guest agent is not running")
+
+    # --- Cluster --------------------------------------------------------------
+
+    @_route("GET", r"/nodes")
+    def _nodes(self, params, form):
+        return [{"node": name, "status": n["status"], "maxcpu": 64, "maxmem": 256 << 30, "cpu": 0.1, "mem": 32 << 30}
+                for name, n in self.nodes.items()]
+
+    @_route("GET", r"/cluster/status")
+    def _cluster_status(self, params, form):
+        entries = [{"type": "cluster", "name": "sim", "quorate": 1, "nodes": len(self.nodes)}]
+        for i, (name, n) in enumerate(self.nodes.items()):
+            entries.append({"type": "node", "name": name, "nodeid": i + 1, "ip": f"192.0.2.{i + 1}",
+                            "online": 1 if n["status"] == "online" else 0, "local": 1 if i == 0 else 0})
+        return entries
+
+    @_route("GET", r"/cluster/resources")
+    def _cluster_resources(self, params, form):
+        return [{"id": f"qemu/{vm['vmid']}", "type": "qemu", "vmid": vm["vmid"], "node": vm["node"],
+                 "name": vm["name"], "status": vm["status"], "tags": vm["config"].get("tags", "")}
+                for vm in self.vms.values()]
+
+    @_route("GET", r"/cluster/nextid")
+    def _nextid(self, params, form):
+        if "vmid" in params:
+            if int(params["vmid"]) in self.vms:
+                raise SimError(400, f"VM {params['vmid']} already exists")
+            return params["vmid"]
+        vmid = 100
+        while vmid in self.vms:
+            vmid += 1
+        return str(vmid)
+
+    # --- Tasks ----------------------------------------------------------------
+
+    @_route("GET", r"/nodes/([^/]+)/tasks")
+    def _tasks(self, node, params, form):
+        self._node(node)
+        since = int(params.get("since", 0))
+        limit = int(params.get("limit", 50))
+        listed = []
+        for task in sorted(self.tasks.values(), key=lambda t: t["starttime"], reverse=True):
+            if task["node"] != node or task["starttime"] < since:
+                continue
+            entry = {"upid": task["upid"], "node": node, "type": task["type"], "id": task["id"],
+                     "starttime": task["starttime"], "user": "root@pam"}
+            if self._settle(task):
+                entry["status"] = task["exitstatus"]
+                entry["endtime"] = int(time.time())
+            elif self.running_task_status is not None:
+                entry["status"] = self.running_task_status
+            listed.append(entry)
+        return listed[:limit]
+
+    @_route("GET", r"/nodes/([^/]+)/tasks/([^/]+)/status")
+    def _task_status(self, node, upid, params, form):
+        task = self.tasks.get(upid)
+        if task is None:
+            raise SimError(500, f"no such task '{upid}'")
+        if self._settle(task):
+            return {"upid": upid, "status": "stopped", "exitstatus": task["exitstatus"]}
+        return {"upid": upid, "status": "running"}
+
+    @_route("DELETE", r"/nodes/([^/]+)/tasks/([^/]+)")
+    def _task_stop(self, node, upid, params, form):
+        task = self.tasks.get(upid)
+        if task is not None and not task["done"]:
+            task.update(done=True, exitstatus="interrupted by signal", on_done=None)
+        return None
+
+    # --- Storage --------------------------------------------------------------
+
+    @_route("GET", r"/nodes/([^/]+)/storage/([^/]+)/status")
+    def _storage_status(self, node, storage, params, form):
+        self._node(node)
+        return {"shared": 1 if self.shared_storage else 0, "total": 1 << 40, "used": 1 << 38, "avail": 3 << 38}
+
+    @_route("GET", r"/nodes/([^/]+)/storage/([^/]+)/content")
+    def _content(self, node, storage, params, form):
+        self._node(node)
+        wanted = params.get("content")
+        return [dict(v) for v in self.volumes[node].values() if wanted is None or v["content"] == wanted]
+
+    @_route("DELETE", r"/nodes/([^/]+)/storage/([^/]+)/content/(.+)")
+    def _content_delete(self, node, storage, volid, params, form):
+        self._node(node)
+        if volid not in self.volumes[node]:
+            raise SimError(500, f"volume '{volid}' does not exist")
+        return self._task(node, "imgdel", volid, on_done=lambda: self.volumes[node].pop(volid, None))
+
+    @_route("POST", r"/nodes/([^/]+)/storage/([^/]+)/upload")
+    def _upload(self, node, storage, params, form):
+        self._node(node)
+        body = form.get("_multipart", b"")
+        match = re.search(rb'name="filename"; filename="([^"]+)"', body)
+        if match is None:
+            raise SimError(400, "missing file upload")
+        volid = f"{storage}:iso/{match.group(1).decode()}"
+        size = len(body)
+        return self._task(node, "imgcopy", "", on_done=lambda: self.add_volume(node, volid, size))
+
+    @_route("POST", r"/nodes/([^/]+)/storage/([^/]+)/download-url")
+    def _download_url(self, node, storage, params, form):
+        self._node(node)
+        volid = f"{storage}:{form.get('content', 'iso')}/{form['filename']}"
+        if volid in self.volumes[node]:
+            raise SimError(400, f"refusing to override existing file '{form['filename']}'")
+        for task in self.tasks.values():
+            if task["type"] == "download" and task["node"] == node and task["id"] == volid and not self._settle(task):
+                raise SimError(409, "can't lock file - download already in progress")
+        return self._task(node, "download", volid, on_done=lambda: self.add_volume(node, volid, 1 << 30))
+
+    # --- QEMU -----------------------------------------------------------------
+
+    @_route("GET", r"/nodes/([^/]+)/qemu")
+    def _qemu_list(self, node, params, form):
+        self._node(node)
+        return [{"vmid": vm["vmid"], "name": vm["name"], "status": vm["status"], "cpus": 2, "maxmem": 4 << 30}
+                for vm in self.vms.values() if vm["node"] == node]
+
+    @_route("POST", r"/nodes/([^/]+)/qemu")
+    def _qemu_create(self, node, params, form):
+        self._node(node)
+        vmid = int(form["vmid"])
+        if vmid in self.vms:
+            raise SimError(500, f"unable to create VM {vmid} - VM {vmid} already exists on node '{self.vms[vmid]['node']}'")
+        config = {k: v for k, v in form.items() if k != "vmid"}
+        iso = config.get("ide2", "").split(",")[0]
+        if iso and iso != "none" and iso not in self.volumes[node]:
+            raise SimError(500, f"unable to create VM {vmid} - volume '{iso}' does not exist")
+        source = re.search(r"import-from=([^,]+)", config.get("virtio0", ""))
+        if source and source.group(1) not in self.volumes[node]:
+            raise SimError(500, f"unable to create VM {vmid} - volume '{source.group(1)}' does not exist")
+        vm = self.add_vm(node, vmid, name=form.get("name"), config=config)
+        vm["status"] = "creating"
+        return self._task(node, "qmcreate", str(vmid), on_done=lambda: vm.update(status="stopped"))
+
+    @_route("GET", r"/nodes/([^/]+)/qemu/(\d+)/status/current")
+    def _qemu_status(self, node, vmid, params, form):
+        vm = self._vm(node, vmid)
+        return {"vmid": vm["vmid"], "status": vm["status"], "name": vm["name"]}
+
+    @_route("POST", r"/nodes/([^/]+)/qemu/(\d+)/status/start")
+    def _qemu_start(self, node, vmid, params, form):
+        vm = self._vm(node, vmid)
+        return self._task(node, "qmstart", vmid,
+                          on_done=lambda: vm.update(status="running", started_at=time.monotonic()))
+
+    @_route("POST", r"/nodes/([^/]+)/qemu/(\d+)/status/stop")
+    def _qemu_stop(self, node, vmid, params, form):
+        vm = self._vm(node, vmid)
+        return self._task(node, "qmstop", vmid, on_done=lambda: vm.update(status="stopped", started_at=None))
+
+    @_route("DELETE", r"/nodes/([^/]+)/qemu/(\d+)")
+    def _qemu_destroy(self, node, vmid, params, form):
+        vm = self._vm(node, vmid)
+        if vm["status"] == "running":
+            raise SimError(500, f"VM {vmid} is running - destroy failed")
+        return self._task(node, "qmdestroy", vmid, on_done=lambda: self.vms.pop(int(vmid), None))
+
+    @_route("GET", r"/nodes/([^/]+)/qemu/(\d+)/config")
+    def _qemu_config(self, node, vmid, params, form):
+        vm = self._vm(node, vmid)
+        if "snapshot" in params:
+            if params["snapshot"] not in vm["snapshots"]:
+                raise SimError(500, f"snapshot '{params['snapshot']}' does not exist")
+            return dict(vm["snapshots"][params["snapshot"]])
+        return {**vm["config"], **vm["pending"]}
+
+    @_route("PUT", r"/nodes/([^/]+)/qemu/(\d+)/config")
+    def _qemu_config_set(self, node, vmid, params, form):
+        vm = self._vm(node, vmid)
+        vm["config"].update(form)
+        if "name" in form:
+            vm["name"] = form["name"]
+        return None
+
+    @_route("GET", r"/nodes/([^/]+)/qemu/(\d+)/pending")
+    def _qemu_pending(self, node, vmid, params, form):
+        vm = self._vm(node, vmid)
+        entries = []
+        for key in sorted(set(vm["config"]) | set(vm["pending"])):
+            entry = {"key": key}
+            if key in vm["config"]:
+                entry["value"] = vm["config"][key]
+            if key in vm["pending"]:
+                entry["pending"] = vm["pending"][key]
+            entries.append(entry)
+        return entries
+
+    @_route("GET", r"/nodes/([^/]+)/qemu/(\d+)/snapshot")
+    def _qemu_snapshots(self, node, vmid, params, form):
+        vm = self._vm(node, vmid)
+        return [{"name": name} for name in vm["snapshots"]] + [{"name": "current", "running": 0}]
+
+    @_route("PUT", r"/nodes/([^/]+)/qemu/(\d+)/resize")
+    def _qemu_resize(self, node, vmid, params, form):
+        vm = self._vm(node, vmid)
+        return self._task(node, "resize", vmid, on_done=lambda: vm["config"].update(size=form.get("size")))
+
+    # --- Guest agent ----------------------------------------------------------
+
+    @_route("GET", r"/nodes/([^/]+)/qemu/(\d+)/agent/info")
+    def _agent_info(self, node, vmid, params, form):
+        self._require_agent(self._vm(node, vmid))
+        return {"result": {"version": "8.2.2", "supported_commands": []}}
+
+    @_route("POST", r"/nodes/([^/]+)/qemu/(\d+)/agent/ping")
+    def _agent_ping(self, node, vmid, params, form):
+        self._require_agent(self._vm(node, vmid))
+        return {"result": {}}
+
+    @_route("GET", r"/nodes/([^/]+)/qemu/(\d+)/agent/network-get-interfaces")
+    def _agent_interfaces(self, node, vmid, params, form):
+        vm = self._vm(node, vmid)
+        self._require_agent(vm)
+        return {"result": [
+            {"name": "lo", "ip-addresses": [{"ip-address-type": "ipv4", "ip-address": "127.0.0.1", "prefix": 8}]},
+            {"name": "eth0", "ip-addresses": [{"ip-address-type": "ipv4", "ip-address": vm["ip"], "prefix": 24}]},
+        ]}
+
+    def _cloudinit_done(self, vm: dict) -> bool:
+        return self._agent_up(vm) and time.monotonic() - vm["started_at"] >= self.cloudinit_delay
+
+    @_route("GET", r"/nodes/([^/]+)/qemu/(\d+)/agent/file-read")
+    def _agent_file_read(self, node, vmid, params, form):
+        vm = self._vm(node, vmid)
+        self._require_agent(vm)
+        if params.get("file") == "/var/lib/cloud/instance/boot-finished" and self._cloudinit_done(vm):
+            return {"content": "boot finished\n", "bytes-read": 14}
+        raise SimError(500, f"Agent error: can't open file {params.get('file')}: No such file or directory")
+
+    @_route("POST", r"/nodes/([^/]+)/qemu/(\d+)/agent/exec")
+    def _agent_exec(self, node, vmid, params, form):
+        vm = self._vm(node, vmid)
+        self._require_agent(vm)
+        pid = next(self._exec_pids)
+        command = form.get("command") or []
+        ok = not (command[:2] == ["ls", "/var/lib/cloud/instance/boot-finished"] and not self._cloudinit_done(vm))
+        vm.setdefault("execs", {})[pid] = (time.monotonic() + self.exec_delay, ok)
+        return {"pid": pid}
+
+    @_route("GET", r"/nodes/([^/]+)/qemu/(\d+)/agent/exec-status")
+    def _agent_exec_status(self, node, vmid, params, form):
+        vm = self._vm(node, vmid)
+        done_at, ok = vm.get("execs", {})[int(params["pid"])]
+        if time.monotonic() < done_at:
+            return {"exited": 0}
+        return {"exited": 1, "exitcode": 0 if ok else 2, "out-data": "", "err-data": ""}
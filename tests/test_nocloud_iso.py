@@ -0,0 +1,80 @@
+"""The template NoCloud writer must produce the same bytes as pycdlib, bar pycdlib's application ID."""
+
+import io
+import os
+import time
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("pycdlib")
+
+from glueops.nocloud_iso import write_nocloud_iso
+from glueops.proxmox import _write_cloudinit_iso_pycdlib
+
+TIMESTAMP = 1700000000.0
+
+# the primary volume descriptor's application identifier: pycdlib writes its own
+# copyright notice there and has changed it between releases
+APPLICATION_ID = slice(16 * 2048 + 574, 16 * 2048 + 574 + 128)
+
+# (user-data bytes, meta-data bytes): empty files, sector boundaries and a multi-extent file
+SIZES = [
+    (0, 0),
+    (1, 0),
+    (2048, 2048),
+    (2049, 2047),
+    (100 * 1024, 333),
+    (4096, 4097),
+]
+
+
+@pytest.fixture(params=["UTC", "America/St_Johns"])
+def timezone(request):
+    """Run under a timezone; St. John's has a half-hour UTC offset."""
+    previous = os.environ.get("TZ")
+    os.environ["TZ"] = request.param
+    time.tzset()
+    yield request.param
+    if previous is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = previous
+    time.tzset()
+
+
+def _normalised(iso: bytes) -> bytes:
+    iso = bytearray(iso)
+    iso[APPLICATION_ID] = b" " * 128
+    return bytes(iso)
+
+
+def _pycdlib_iso(user_data: bytes, meta_data: bytes) -> bytes:
+    buf = io.BytesIO()
+    with mock.patch("time.time", return_value=TIMESTAMP):
+        _write_cloudinit_iso_pycdlib(buf, user_data, meta_data)
+    return _normalised(buf.getvalue())
+
+
+@pytest.mark.parametrize("user_size,meta_size", SIZES)
+def test_matches_pycdlib(timezone, user_size, meta_size):
+    user_data = os.urandom(user_size)
+    meta_data = os.urandom(meta_size)
+    expected = _pycdlib_iso(user_data, meta_data)
+
+    buf = io.BytesIO()
+    written = write_nocloud_iso(buf, user_data, meta_data, timestamp=TIMESTAMP)
+
+    assert written == len(expected)
+    assert _normalised(buf.getvalue()) == expected
+
+
+def test_timestamp_defaults_to_now(timezone):
+    user_data, meta_data = b"#cloud-config\n", b"instance-id: vm1\n"
+    expected = _pycdlib_iso(user_data, meta_data)
+
+    buf = io.BytesIO()
+    with mock.patch("time.time", return_value=TIMESTAMP):
+        write_nocloud_iso(buf, user_data, meta_data)
+
+    assert _normalised(buf.getvalue()) == expected
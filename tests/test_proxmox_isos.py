@@ -0,0 +1,51 @@
+"""eject_and_delete_iso against the simulator."""
+
+import asyncio
+
+from glueops.proxmox import ProxmoxClient
+from proxmox_sim import FakeProxmox
+
+ISO = "t-shared.iso"
+VOLID = f"local:iso/{ISO}"
+
+
+def _shared_iso_sim() -> FakeProxmox:
+    sim = FakeProxmox(nodes=["pve1"])
+    sim.add_volume("pve1", VOLID)
+    for vmid in (101, 102):
+        sim.add_vm("pve1", vmid, config={"ide2": f"{VOLID},media=cdrom"})
+    return sim
+
+
+def _eject(sim: FakeProxmox, **kwargs):
+    async def main():
+        client = ProxmoxClient("sim", "automation@pve!test", "secret", storage="local", transport=sim.transport())
+        try:
+            await client.eject_and_delete_iso("pve1", "101", ISO, **kwargs)
+        finally:
+            await client.aclose()
+    asyncio.run(main())
+
+
+def test_shared_iso_is_kept_by_default():
+    sim = _shared_iso_sim()
+    _eject(sim)
+
+    assert sim.vms[101]["config"]["ide2"] == "none,media=cdrom"
+    assert VOLID in sim.volumes["pve1"]
+
+
+def test_unreferenced_iso_is_deleted():
+    sim = _shared_iso_sim()
+    sim.vms[102]["config"]["ide2"] = "none,media=cdrom"
+    _eject(sim)
+
+    assert VOLID not in sim.volumes["pve1"]
+
+
+def test_skip_in_use_false_deletes_without_a_scan():
+    sim = _shared_iso_sim()
+    _eject(sim, skip_in_use=False)
+
+    assert VOLID not in sim.volumes["pve1"]
+    assert sim.request_count("GET", "/nodes/{node}/qemu/{vmid}/pending") == 0
@@ -0,0 +1,144 @@
+"""provision_many against the simulator: cleanup, shared ISOs, shared readiness checks."""
+
+import asyncio
+import contextlib
+
+from glueops import proxmox
+from glueops.proxmox import ProxmoxClient, cloudinit_iso_name
+from proxmox_sim import FakeProxmox
+
+IMAGE = "debian-13-generic-amd64"
+USER_DATA = b"#cloud-config\n"
+
+
+def _sim(**kwargs) -> FakeProxmox:
+    sim = FakeProxmox(nodes=["pve1", "pve2"], **kwargs)
+    for node in sim.nodes:
+        sim.add_volume(node, f"local:import/{IMAGE}.qcow2")
+    return sim
+
+
+def _spec(i: int, node: str = "pve1", **extra) -> dict:
+    spec = dict(node=node, vm_name=f"t-vm{i}", vcpus=2, memory_mb=2048, image=IMAGE, bridge="vmbr0",
+                user_data=USER_DATA, meta_data=f"instance-id: t-vm{i}\n".encode())
+    spec.update(extra)
+    return spec
+
+
+def _isos(sim: FakeProxmox) -> set:
+    return {(node, volid) for node, volumes in sim.volumes.items() for volid in volumes if ":iso/" in volid}
+
+
+def _provision(sim: FakeProxmox, specs, stop_after: int = None, setup=None, **kwargs) -> list:
+    async def main():
+        client = ProxmoxClient("sim", "automation@pve!test", "secret", storage="local", transport=sim.transport())
+        if setup is not None:
+            setup(client)
+        results = []
+        try:
+            async with contextlib.aclosing(client.provision_many(specs, **kwargs)) as provisioned:
+                async for result in provisioned:
+                    results.append(result)
+                    if stop_after is not None and len(results) >= stop_after:
+                        break
+        finally:
+            await client.aclose()
+        return results
+    return asyncio.run(main())
+
+
+def test_failed_create_deletes_its_iso():
+    sim = _sim()
+    results = _provision(sim, [_spec(0), _spec(1, image="missing-image")])
+
+    by_name = {r["vm_name"]: r for r in results}
+    assert by_name["t-vm0"]["error"] is None
+    assert by_name["t-vm1"]["stage"] == "create"
+    assert [vm["name"] for vm in sim.vms.values()] == ["t-vm0"]
+    assert _isos(sim) == {("pve1", "local:iso/t-vm0-cloudinit.iso")}
+
+
+def test_ready_timeout_deletes_vm_and_iso():
+    sim = _sim(cloudinit_delay=60)
+    [result] = _provision(sim, [_spec(0)], ready_timeout=0.3)
+
+    assert isinstance(result["error"], TimeoutError)
+    assert result["stage"] == "ready"
+    assert sim.vms == {}
+    assert _isos(sim) == set()
+
+
+def test_early_close_cleans_up_unfinished_vms():
+    sim = _sim()
+    specs = [_spec(i, node=["pve1", "pve2"][i % 2]) for i in range(6)]
+    [first] = _provision(sim, specs, stop_after=1, eject_iso=True)
+
+    assert first["error"] is None
+    assert list(sim.vms) == [int(first["vmid"])]
+    assert _isos(sim) == set()
+
+
+def _shared_specs(count: int):
+    meta_data = b"instance-id: shared\n"
+    specs = [_spec(i, node=["pve1", "pve2"][i % 2], iso_prefix="t", meta_data=meta_data) for i in range(count)]
+    return specs, cloudinit_iso_name("t", USER_DATA, meta_data)
+
+
+def test_shared_iso_is_deleted_once_after_the_batch():
+    sim = _sim()
+    specs, iso = _shared_specs(4)
+
+    results = _provision(sim, specs, eject_iso=True)
+
+    assert all(r["error"] is None and r["iso_filename"] == iso for r in results)
+    assert _isos(sim) == set()
+    for result in results:
+        assert not sim.vms[int(result["vmid"])]["config"]["ide2"].startswith("local:iso/")
+    # one reference scan for the batch: each VM's pending config is read once
+    assert sim.request_count("GET", "/nodes/{node}/qemu/{vmid}/pending") == 4
+
+
+def test_shared_iso_still_referenced_is_kept():
+    sim = _sim()
+    specs, iso = _shared_specs(4)
+    # a VM outside the batch still uses the shared ISO
+    sim.add_volume("pve2", f"local:iso/{iso}")
+    sim.add_vm("pve2", 900, config={"ide2": f"local:iso/{iso},media=cdrom"})
+
+    results = _provision(sim, specs, eject_iso=True)
+
+    assert all(r["error"] is None for r in results)
+    assert ("pve2", f"local:iso/{iso}") in _isos(sim)
+
+
+def test_ready_checks_share_one_watcher_and_budget(monkeypatch):
+    sim = _sim(latency=0.005)
+    watchers = []
+
+    class CountingWatcher(proxmox._ReadyWatcher):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            watchers.append(self)
+
+    monkeypatch.setattr(proxmox, "_ReadyWatcher", CountingWatcher)
+    probes = {"inflight": 0, "peak": 0}
+
+    def count_probes(client):
+        probe = client._probe_readiness
+
+        async def counted(state, skip_interface_prefixes):
+            probes["inflight"] += 1
+            probes["peak"] = max(probes["peak"], probes["inflight"])
+            try:
+                return await probe(state, skip_interface_prefixes)
+            finally:
+                probes["inflight"] -= 1
+
+        client._probe_readiness = counted
+
+    specs = [_spec(i, node=["pve1", "pve2"][i % 2]) for i in range(8)]
+    results = _provision(sim, specs, setup=count_probes, stage_limits={"ready": 2})
+
+    assert len(watchers) == 1
+    assert probes["peak"] <= 2
+    assert all(r["error"] is None and r["ip"] is not None for r in results)
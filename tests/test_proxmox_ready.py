@@ -0,0 +1,46 @@
+"""watch_ready against the simulator."""
+
+import asyncio
+import time
+
+from glueops.proxmox import ProxmoxClient
+from proxmox_sim import FakeProxmox
+
+
+def _watch(sim: FakeProxmox, vms, during=None, **kwargs) -> list:
+    async def main():
+        client = ProxmoxClient("sim", "automation@pve!test", "secret", storage="local", transport=sim.transport())
+        side = asyncio.ensure_future(during()) if during is not None else None
+        try:
+            return [vm async for vm in client.watch_ready(vms, **kwargs)]
+        finally:
+            if side is not None:
+                await side
+            await client.aclose()
+    return asyncio.run(main())
+
+
+def test_ipv4_is_read_after_cloud_init():
+    sim = FakeProxmox(nodes=["pve1"], agent_delay=0.0, cloudinit_delay=0.4)
+    vm = sim.add_vm("pve1", 101, status="running")
+    vm["started_at"] = time.monotonic()  # just booted
+
+    async def reconfigure_network():
+        # cloud-init applies a static address from user-data before it finishes
+        await asyncio.sleep(0.2)
+        vm["ip"] = "192.0.2.50"
+
+    [ready] = _watch(sim, [("pve1", 101)], during=reconfigure_network, initial_interval=0.05, max_interval=0.1)
+
+    assert ready["error"] is None
+    assert ready["ip"] == "192.0.2.50"
+
+
+def test_cloud_init_timeout_is_reported():
+    sim = FakeProxmox(nodes=["pve1"], agent_delay=0.0, cloudinit_delay=60)
+    sim.add_vm("pve1", 101, status="running")["started_at"] = time.monotonic()
+
+    [ready] = _watch(sim, [("pve1", 101)], timeout=0.2, initial_interval=0.05, max_interval=0.1)
+
+    assert isinstance(ready["error"], TimeoutError)
+    assert "cloud-init" in str(ready["error"])
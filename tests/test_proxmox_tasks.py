@@ -0,0 +1,100 @@
+"""poll_task waiters multiplexed through one _TaskWatcher poller per node."""
+
+import asyncio
+
+import pytest
+
+from glueops.proxmox import ProxmoxClient
+from proxmox_sim import FakeProxmox
+
+LIST_TASKS = "/nodes/{node}/tasks"
+TASK_STATUS = "/nodes/{node}/tasks/{upid}/status"
+
+
+def _run(sim: FakeProxmox, scenario):
+    async def main():
+        client = ProxmoxClient("sim", "automation@pve!test", "secret", storage="local", transport=sim.transport())
+        try:
+            return await scenario(client)
+        finally:
+            await client.aclose()
+    return asyncio.run(main())
+
+
+def test_concurrent_waiters_share_one_poller():
+    sim = FakeProxmox(nodes=["pve1"])
+    upids = [sim.add_task("pve1", "qmstart", str(100 + i), duration=0.05 + 0.005 * i) for i in range(50)]
+
+    async def scenario(client):
+        waits = [asyncio.ensure_future(client.poll_task(upid, max_interval=0.1)) for upid in upids]
+        await asyncio.sleep(0.01)
+        pollers = len(client._watcher._pollers)
+        await asyncio.gather(*waits)
+        return pollers
+
+    assert _run(sim, scenario) == 1
+    assert sim.request_count(template=LIST_TASKS) < 20
+    assert sim.request_count(template=TASK_STATUS) == 0
+
+
+@pytest.mark.parametrize("running_status", ["RUNNING", "active", "unknown"])
+def test_running_task_status_is_not_completion(running_status):
+    sim = FakeProxmox(nodes=["pve1"], running_task_status=running_status)
+    upid = sim.add_task("pve1", duration=0.2)
+
+    async def scenario(client):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await client.poll_task(upid, initial_interval=0.02, max_interval=0.05)
+        return loop.time() - started
+
+    assert _run(sim, scenario) >= 0.2
+
+
+def test_failed_task_fails_only_its_waiter():
+    sim = FakeProxmox(nodes=["pve1"])
+    upids = [sim.add_task("pve1", duration=0.05) for _ in range(5)]
+    failing = sim.add_task("pve1", duration=0.05, exitstatus="command 'qm start' failed: exit code 1")
+
+    async def scenario(client):
+        return await asyncio.gather(*(client.poll_task(upid, max_interval=0.1) for upid in upids + [failing]),
+                                    return_exceptions=True)
+
+    results = _run(sim, scenario)
+    assert results[:-1] == [None] * 5
+    assert isinstance(results[-1], RuntimeError)
+    assert "Proxmox task failed" in str(results[-1])
+
+
+def test_timeout_stops_task_and_unwatches_it():
+    sim = FakeProxmox(nodes=["pve1"])
+    stalled = sim.add_task("pve1", "download", duration=60)
+    quick = sim.add_task("pve1", duration=0.3)
+
+    async def scenario(client):
+        quick_wait = asyncio.ensure_future(client.poll_task(quick, max_interval=0.05))
+        with pytest.raises(TimeoutError):
+            await client.poll_task(stalled, timeout=0.1, max_interval=0.05)
+        watcher = client._watcher
+        assert stalled not in watcher._waiters["pve1"]
+        await quick_wait
+        await asyncio.sleep(0.01)
+        return dict(watcher._pollers)
+
+    assert _run(sim, scenario) == {}
+    assert sim.tasks[stalled]["exitstatus"] == "interrupted by signal"
+
+
+def test_cancelled_waiter_leaves_other_waiters_on_the_same_task():
+    sim = FakeProxmox(nodes=["pve1"])
+    upid = sim.add_task("pve1", duration=0.2)
+
+    async def scenario(client):
+        first = asyncio.ensure_future(client.poll_task(upid, max_interval=0.05))
+        second = asyncio.ensure_future(client.poll_task(upid, max_interval=0.05))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        await second
+        return first.cancelled()
+
+    assert _run(sim, scenario)
@@ -0,0 +1,99 @@
+"""RateLimitFilter with a fake clock."""
+
+import logging
+
+import pytest
+
+from glueops.setup_logging import RateLimitFilter
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def limited():
+    """(logger, handler, filter, clock): a logger with a 60s RateLimitFilter on a fake clock."""
+    logger = logging.getLogger("glueops.tests.ratelimit")
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    handler = _ListHandler()
+    logger.addHandler(handler)
+    clock = _Clock()
+    log_filter = RateLimitFilter(window=60)
+    log_filter._clock = clock
+    logger.addFilter(log_filter)
+    yield logger, handler, log_filter, clock
+    logger.removeFilter(log_filter)
+    logger.removeHandler(handler)
+
+
+def _poll(logger, vmid, count):
+    for i in range(count):
+        logger.info(f"VM {vmid}: not ready (attempt {i})", extra={"log_key": f"vm-wait:{vmid}"})
+
+
+def test_next_record_for_the_key_carries_the_count(limited):
+    logger, handler, _, clock = limited
+    _poll(logger, 101, 4)
+    clock.now += 61
+    _poll(logger, 101, 1)
+
+    assert handler.messages == [
+        "VM 101: not ready (attempt 0)",
+        "VM 101: not ready (attempt 0) (suppressed 3 similar within 60s)",
+    ]
+
+
+def test_quiet_key_is_reported_once_its_window_expires(limited):
+    logger, handler, _, clock = limited
+    _poll(logger, 101, 5)  # the loop ends: VM 101 never logs again
+    clock.now += 30
+    logger.info("unrelated")
+    clock.now += 31
+    logger.info("another")
+    logger.info("and another")
+
+    assert handler.messages == [
+        "VM 101: not ready (attempt 0)",
+        "unrelated",
+        "VM 101: not ready (attempt 4) (suppressed 4 similar within 60s)",
+        "another",
+        "and another",
+    ]
+
+
+def test_flush_writes_pending_counts_once(limited):
+    logger, handler, log_filter, _ = limited
+    _poll(logger, 101, 3)
+    _poll(logger, 102, 2)
+    _poll(logger, 103, 1)
+
+    log_filter.flush()
+    log_filter.flush()
+
+    assert handler.messages[3:] == [
+        "VM 101: not ready (attempt 2) (suppressed 2 similar within 60s)",
+        "VM 102: not ready (attempt 1) (suppressed 1 similar within 60s)",
+    ]
+
+
+def test_errors_are_never_limited(limited):
+    logger, handler, _, _ = limited
+    for _ in range(3):
+        logger.error("VM 101: agent failed", extra={"log_key": "vm-wait:101"})
+
+    assert handler.messages == ["VM 101: agent failed"] * 3
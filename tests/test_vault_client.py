@@ -0,0 +1,102 @@
+"""AsyncVaultClient against an in-memory KV v2 served through httpx.MockTransport."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from glueops import vault_client
+from glueops.vault_client import AsyncVaultClient, CheckAndSetError, RedirectError
+
+
+class _FakeVault:
+    """KV v2 at secret/; the Kubernetes login is redirected from the standby to the active node."""
+
+    def __init__(self):
+        self.secrets = {}  # path under secret/data/ -> list of versions
+        self.writes = []  # request bodies of secret writes
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self._handle)
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/v1/auth/kubernetes/login":
+            if request.url.host != "active.vault":
+                return httpx.Response(307, headers={"Location": "https://active.vault/v1/auth/kubernetes/login"})
+            return httpx.Response(200, json={"auth": {"client_token": "t1", "lease_duration": 3600, "renewable": True}})
+        if request.headers.get("X-Vault-Token") != "t1":
+            return httpx.Response(403, json={"errors": ["permission denied"]})
+        if path.startswith("/v1/secret/data/moved"):
+            return httpx.Response(302, headers={"Location": "https://auth.example.com/"})
+        name = path[len("/v1/secret/data/"):]
+        versions = self.secrets.setdefault(name, [])
+        if request.method == "GET":
+            if not versions:
+                return httpx.Response(404, json={"errors": []})
+            return httpx.Response(200, json={"data": {"data": versions[-1], "metadata": {"version": len(versions)}}})
+        body = json.loads(request.content)
+        self.writes.append(body)
+        cas = (body.get("options") or {}).get("cas")
+        if cas is not None and cas != len(versions):
+            return httpx.Response(400, json={"errors": ["check-and-set parameter did not match the current version"]})
+        versions.append(body["data"])
+        return httpx.Response(200, json={"data": {"version": len(versions)}})
+
+
+@pytest.fixture
+def vault(tmp_path, monkeypatch):
+    token_file = tmp_path / "token"
+    token_file.write_text("jwt")
+    monkeypatch.setattr(vault_client, "SERVICE_ACCOUNT_TOKEN_PATH", str(token_file))
+    return _FakeVault()
+
+
+def _run(vault: _FakeVault, scenario):
+    async def main():
+        async with AsyncVaultClient("https://standby.vault", "role", transport=vault.transport()) as client:
+            return await scenario(client)
+    return asyncio.run(main())
+
+
+def test_login_follows_standby_redirect(vault):
+    vault.secrets["app"] = [{"key": "value"}]
+
+    async def scenario(client):
+        return await client.get_data_from_vault("secret/app")
+
+    assert _run(vault, scenario) == {"key": "value"}
+
+
+def test_read_redirect_still_raises(vault):
+    async def scenario(client):
+        with pytest.raises(RedirectError):
+            await client.get_data_from_vault("secret/moved")
+
+    _run(vault, scenario)
+
+
+def test_cas_conflict_raises(vault):
+    vault.secrets["app"] = [{"v": 1}, {"v": 2}]
+
+    async def scenario(client):
+        with pytest.raises(CheckAndSetError):
+            await client.write_data_to_vault("secret/app", {"v": 3}, cas=1)
+        await client.write_data_to_vault("secret/app", {"v": 3}, cas=2)
+
+    _run(vault, scenario)
+    assert vault.secrets["app"][-1] == {"v": 3}
+
+
+def test_write_if_changed(vault):
+    vault.secrets["app"] = [{"a": 1, "b": 2}]
+
+    async def scenario(client):
+        unchanged = await client.write_if_changed("secret/app", {"b": 2, "a": 1}, cas=True)
+        changed = await client.write_if_changed("secret/app", {"a": 1, "b": 3}, cas=True)
+        trusted = await client.write_if_changed("secret/app", {"a": 1, "b": 3}, trust_local_digest=True)
+        return unchanged, changed, trusted
+
+    assert _run(vault, scenario) == (False, True, False)
+    assert vault.writes == [{"data": {"a": 1, "b": 3}, "options": {"cas": 1}}]